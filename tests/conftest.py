@@ -1,11 +1,13 @@
-import random
+import csv
+import os
 import shutil
 from datetime import datetime
+from io import StringIO
 
+import numpy as np
 import pandas as pd
 import pytest
 from faker import Faker
-from pydantic import BaseModel, Field
 from sqlalchemy import create_engine
 from test_seed import SEED_SCHEMA_PATH
 
@@ -13,7 +15,36 @@ from nesso.common import BASE_MODELS_SCHEMA, DBT_PROJECT_DIR
 
 fake = Faker()
 
-test_tables_nrows = 100
+test_tables_nrows = int(os.environ.get("NESSO_TEST_TABLES_NROWS", 100))
+
+# Faker is slow, so we only generate this many distinct values per column and sample
+# rows from them.
+fake_values_pool_size = 1000
+
+
+def fake_column(faker_method, nrows: int) -> np.ndarray:
+    """Generate a column of `nrows` fake values drawn from a pool of Faker values."""
+    pool = [faker_method() for _ in range(min(nrows, fake_values_pool_size))]
+    # Only repeat values once the pool is exhausted, so that small tables keep the
+    # same (mostly distinct) values as when each row was generated with Faker.
+    return np.random.choice(pool, size=nrows, replace=nrows > len(pool))
+
+
+def psql_insert_copy(table, conn, keys, data_iter):
+    """
+    Load data with Postgres' `COPY FROM STDIN`, which is much faster than INSERTs.
+
+    Used as the `method` of `DataFrame.to_sql()`.
+    """
+    dbapi_conn = conn.connection
+    with dbapi_conn.cursor() as cur:
+        buffer = StringIO()
+        csv.writer(buffer).writerows(data_iter)
+        buffer.seek(0)
+
+        columns = ", ".join(f'"{key}"' for key in keys)
+        table_name = f'"{table.schema}"."{table.name}"' if table.schema else table.name
+        cur.copy_expert(f"COPY {table_name} ({columns}) FROM STDIN WITH CSV", buffer)
 
 
 @pytest.fixture(scope="session", autouse=True)
@@ -98,26 +129,21 @@ def create_contacts_table(postgres_connection, TEST_SOURCE, TEST_TABLE_CONTACT):
 
     postgres_connection.execute(f"DROP TABLE IF EXISTS {TEST_TABLE_CONTACT} CASCADE;")
 
-    class Contact(BaseModel):
-        Id: str = Field(default_factory=lambda: i)
-        AccountId: str = Field(
-            default_factory=lambda: random.randint(1, test_tables_nrows)
-        )
-        FirstName: str = Field(default_factory=fake.first_name)
-        LastName: str = Field(default_factory=fake.last_name)
-        ContactEMail: str = Field(default_factory=fake.email)
-        MailingCity: str = Field(default_factory=fake.city)
-        Country: str = Field(default_factory=fake.country)
-        # we need to use alias as pydantic doesn't support fields starting with an underscore
-        viadot_downloaded_at_utc: datetime = Field(
-            default_factory=datetime.utcnow, alias="_viadot_downloaded_at_utc"
-        )
-
-    contacts = []
-
-    for i in range(1, test_tables_nrows + 1):
-        contacts.append(Contact(Id=i).dict(by_alias=True))
-    contacts_df_pandas = pd.DataFrame(contacts)
+    ids = np.arange(1, test_tables_nrows + 1)
+    contacts_df_pandas = pd.DataFrame(
+        {
+            "Id": ids.astype(str),
+            "AccountId": np.random.randint(
+                1, test_tables_nrows + 1, size=test_tables_nrows
+            ).astype(str),
+            "FirstName": fake_column(fake.first_name, test_tables_nrows),
+            "LastName": fake_column(fake.last_name, test_tables_nrows),
+            "ContactEMail": fake_column(fake.email, test_tables_nrows),
+            "MailingCity": fake_column(fake.city, test_tables_nrows),
+            "Country": fake_column(fake.country, test_tables_nrows),
+            "_viadot_downloaded_at_utc": datetime.utcnow(),
+        }
+    )
 
     contacts_df_pandas.to_sql(
         TEST_TABLE_CONTACT,
@@ -125,6 +151,7 @@ def create_contacts_table(postgres_connection, TEST_SOURCE, TEST_TABLE_CONTACT):
         schema=TEST_SOURCE,
         if_exists="replace",
         index=False,
+        method=psql_insert_copy,
     )
 
     yield
@@ -137,23 +164,18 @@ def create_accouts_table(postgres_connection, TEST_SOURCE, TEST_TABLE_ACCOUNT):
 
     postgres_connection.execute(f"DROP TABLE IF EXISTS {TEST_TABLE_ACCOUNT} CASCADE;")
 
-    class Account(BaseModel):
-        id: str = Field(default_factory=lambda: i)
-        name: str = Field(default_factory=fake.company)
-        email: str = Field(default_factory=fake.email)
-        mobile: str = Field(default_factory=fake.phone_number)
-        country: str = Field(default_factory=fake.country)
-        city: str = Field(default_factory=fake.city)
-        # we need to use alias as pydantic doesn't support fields starting with an underscore
-        viadot_downloaded_at_utc: datetime = Field(
-            default_factory=datetime.utcnow, alias="_viadot_downloaded_at_utc"
-        )
-
-    accounts = []
-
-    for i in range(1, test_tables_nrows + 1):
-        accounts.append(Account(id=i).dict(by_alias=True))
-    accounts_df_pandas = pd.DataFrame(accounts)
+    ids = np.arange(1, test_tables_nrows + 1)
+    accounts_df_pandas = pd.DataFrame(
+        {
+            "id": ids.astype(str),
+            "name": fake_column(fake.company, test_tables_nrows),
+            "email": fake_column(fake.email, test_tables_nrows),
+            "mobile": fake_column(fake.phone_number, test_tables_nrows),
+            "country": fake_column(fake.country, test_tables_nrows),
+            "city": fake_column(fake.city, test_tables_nrows),
+            "_viadot_downloaded_at_utc": datetime.utcnow(),
+        }
+    )
 
     accounts_df_pandas.to_sql(
         TEST_TABLE_ACCOUNT,
@@ -161,6 +183,7 @@ def create_accouts_table(postgres_connection, TEST_SOURCE, TEST_TABLE_ACCOUNT):
         schema=TEST_SOURCE,
         if_exists="replace",
         index=False,
+        method=psql_insert_copy,
     )
 
     yield
@@ -1,11 +1,39 @@
+{% macro get_graph_index() %}
+{# 
+Index graph nodes and sources by name in a single pass over the graph.
+
+Looking a node up by name with `selectattr()` scans the whole graph, so helpers
+called many times per model (or for many models) should share one index instead.
+
+Returns: Dict[str, Dict[str, List[Node]]]
+
+Example:
+>>> {% set graph_index = get_graph_index() %}
+>>> {{ graph_index["model"]["c4c_contact"] }}
+#}
+    {% set graph_index = {"model": {}, "source": {}} %}
+
+    {% for node in graph.nodes.values() %}
+        {% do graph_index["model"].setdefault(node.name, []).append(node) %}
+    {% endfor %}
+    {% for node in graph.sources.values() %}
+        {% do graph_index["source"].setdefault(node.name, []).append(node) %}
+    {% endfor %}
+
+    {{ return(graph_index) }}
+{% endmacro %}
+
+
 {# retrieve models directly upstream from a given model #}
-{% macro get_model_dependencies(model_name) %}
+{% macro get_model_dependencies(model_name, graph_index=none) %}
     {{ log("Getting upstream dependencies for model '" ~ model_name ~ "'...") }}
-    
-    {% set upstream_fqns=[] %}
+
+    {% if graph_index is none %}
+        {% set graph_index = get_graph_index() %}
+    {% endif %}
 
     {{ log("Checking upstream models...") }}
-    {% for node in graph.nodes.values() | selectattr('name', "equalto", model_name) %}
+    {% for node in graph_index["model"].get(model_name, []) %}
         {% if node.depends_on.nodes and not "source." in node.depends_on.nodes[0] %}
             {# The node depends on another model. #}
             {{ log("Got the following dependencies: " ~ node.depends_on.nodes ~ ".") }}
@@ -14,14 +42,14 @@
     {% endfor %}
 
     {{ log("Checking upstream source...") }}
-    {% for node in graph.sources.values() | selectattr('name', "equalto", model_name) %}
+    {% for node in graph_index["source"].get(model_name, []) %}
         {{ return({"type": "source", "node": node.unique_id}) }}
     {% endfor %}
 
 {% endmacro %}
 
 
-{% macro get_source_or_model_column_metadata(model_name, model_type = "model") %}
+{% macro get_source_or_model_column_metadata(model_name, model_type = "model", graph_index=none) %}
 {# 
 Get column metadata (description and tags) for a model or source.
 
@@ -32,14 +60,14 @@ Example:
 >>> {"id": {"description": "A", "tags": []}}
 #}
     
-    {% if model_type == "model" %}
-        {% set nodes = graph.nodes.values() %}
-    {% else %}
-        {% set nodes = graph.sources.values() %}
+    {% if graph_index is none %}
+        {% set graph_index = get_graph_index() %}
     {% endif %}
 
+    {% set nodes = graph_index["model" if model_type == "model" else "source"].get(model_name, []) %}
+
     {% set columns_metadata_dict = {} %}
-    {% for node in nodes | selectattr('name', "equalto", model_name) %}
+    {% for node in nodes %}
         {% for col_name, col_values in node.columns.items() %}
             {% do columns_metadata_dict.update(
                 {col_name: {
@@ -56,7 +84,7 @@ Example:
 
 {# build a global dictionary looping through all the direct parents models #}
 
-{% macro get_parent_source_or_model_column_metadata(model_name) %}
+{% macro get_parent_source_or_model_column_metadata(model_name, graph_index=none) %}
 {# 
 Get column metadata (description and tags) for the model's or source's
 parent source or model.
@@ -80,21 +108,25 @@ Example:
     {{ log("Getting column-level metadata for " ~ model_type ~ " '" ~ model_name ~ "'...") }}
 
     {% if execute %}
-        {% set dependencies = get_model_dependencies(model_name) %}
+        {% if graph_index is none %}
+            {% set graph_index = get_graph_index() %}
+        {% endif %}
+
+        {% set dependencies = get_model_dependencies(model_name, graph_index=graph_index) %}
         {% set model_type = dependencies["type"] %}
 
         {# Note we immediately return `column_metadata`, as outside the if/else, it's magically set to None. #}
         {% if model_type == "model" %}
             {% for full_model in dependencies["nodes"] %}
                 {% set upstream_model_name = full_model.split('.')[-1] %}
-                {% set column_metadata = get_source_or_model_column_metadata(model_name=upstream_model_name, model_type=model_type) %}
+                {% set column_metadata = get_source_or_model_column_metadata(model_name=upstream_model_name, model_type=model_type, graph_index=graph_index) %}
             {{ return(column_metadata) }}
             {% endfor %}
         {% endif %}
 
         {% if model_type == "source" %}
             {% set upstream_model_name = dependencies["node"].split('.')[-1] %}
-            {% set column_metadata = get_source_or_model_column_metadata(model_name=upstream_model_name, model_type=model_type) %}
+            {% set column_metadata = get_source_or_model_column_metadata(model_name=upstream_model_name, model_type=model_type, graph_index=graph_index) %}
             {{ return(column_metadata) }}
         {% endif %}
     
@@ -102,7 +134,7 @@ Example:
 {% endmacro %}
 
 
-{% macro get_source_or_model_metadata(model_name, model_type = "model") %}
+{% macro get_source_or_model_metadata(model_name, model_type = "model", graph_index=none) %}
 {# 
 Get table metadata (description, tags, and meta) for a model or source.
 
@@ -119,14 +151,14 @@ Example:
     
     {{ log("Getting model-level metadata for " ~ model_type ~ " '" ~ model_name ~ "'...") }}
 
-    {% if model_type == "model" %}
-        {% set nodes = graph.nodes.values() %}
-    {% else %}
-        {% set nodes = graph.sources.values() %}
+    {% if graph_index is none %}
+        {% set graph_index = get_graph_index() %}
     {% endif %}
 
+    {% set nodes = graph_index["model" if model_type == "model" else "source"].get(model_name, []) %}
+
     {% set table_metadata_dict = {} %}
-    {% for node in nodes | selectattr('name', "equalto", model_name) %}
+    {% for node in nodes %}
         {% do table_metadata_dict.update(
             {
                 "description": node.description,
@@ -142,7 +174,7 @@ Example:
 {% endmacro %}
 
 
-{% macro get_parent_source_or_model_metadata(model_name) %}
+{% macro get_parent_source_or_model_metadata(model_name, graph_index=none) %}
 {# 
 Get table metadata (description, tags, and meta) for the model's parent source or model.
 
@@ -161,19 +193,23 @@ Example:
         {{ log("") }}
         {{ log("Running `get_parent_source_or_model_metadata()`...") }}
 
-        {% set dependencies = get_model_dependencies(model_name) %}
+        {% if graph_index is none %}
+            {% set graph_index = get_graph_index() %}
+        {% endif %}
+
+        {% set dependencies = get_model_dependencies(model_name, graph_index=graph_index) %}
         {% set model_type = dependencies["type"] %}
         
         {# Note we immediately return `model_metadata`, as outside the if/else, it's magically set to None. #}
         {% if model_type == "model" %}
             {% for full_model in dependencies["nodes"] %}
                 {% set model_name = full_model.split('.')[-1] %}
-                {% set model_metadata = get_source_or_model_metadata(model_name, model_type=model_type) %}
+                {% set model_metadata = get_source_or_model_metadata(model_name, model_type=model_type, graph_index=graph_index) %}
             {% do return(model_metadata) %}
             {% endfor %}
         {% elif model_type == "source" %}
             {% set model_name = dependencies["node"].split('.')[-1] %}
-            {% set model_metadata = get_source_or_model_metadata(model_name, model_type=model_type) %}
+            {% set model_metadata = get_source_or_model_metadata(model_name, model_type=model_type, graph_index=graph_index) %}
             {% do return(model_metadata) %}
         {% else %}
             {{ log("Incorrect model type (" ~ model_type ~ ").") }}
@@ -183,4 +219,68 @@ Example:
         {{ log("") }}
 
     {% endif %}
+{% endmacro %}
+
+
+{% macro get_schema_columns(schema_name, database_name=target.database, table_names=none) %}
+{# 
+Get the columns of all tables in a schema with a single `information_schema.columns`
+query, instead of introspecting each table separately.
+
+Args:
+    schema_name (str): The schema to snapshot.
+    database_name (str, optional): The database of the schema. Defaults to the target's database.
+    table_names (List[str], optional): Only snapshot these tables. Defaults to all tables.
+
+Returns: Dict[str, List[Dict[str, str]]]
+
+Example:
+>>> dbt run-operation get_schema_columns --args '{"schema_name": "public"}'
+>>> {"contact": [{"name": "id", "data_type": "integer"}, {"name": "name", "data_type": "text"}]}
+#}
+    {{ log("Getting columns of all tables in schema '" ~ schema_name ~ "'...") }}
+
+    {% set information_schema = api.Relation.create(database=database_name, schema=schema_name).information_schema("columns") %}
+
+    {% set schema_columns_sql %}
+        select
+            table_name,
+            column_name,
+            data_type
+        from {{ information_schema }}
+        {# Compare the names as they are, so that the filters can be pushed down to the catalog (eg. in Trino). #}
+        where table_schema = '{{ schema_name }}'
+        {% if table_names is not none %}
+            and table_name in (
+                {%- for table_name in table_names -%}
+                    '{{ table_name }}'{{ "," if not loop.last }}
+                {%- endfor -%}
+            )
+        {% endif %}
+        order by table_name, ordinal_position
+    {% endset %}
+
+    {% set schema_columns = {} %}
+    {% if execute %}
+        {% set results = run_query(schema_columns_sql) %}
+        {% for row in results.rows %}
+            {% do schema_columns.setdefault(row[0], []).append({"name": row[1], "data_type": row[2]}) %}
+        {% endfor %}
+    {% endif %}
+
+    {{ log("Got the columns of " ~ schema_columns | length ~ " tables in schema '" ~ schema_name ~ "'.") }}
+
+    {{ return(schema_columns) }}
+{% endmacro %}
+
+
+{% macro print_schema_columns(schema_name, database_name=target.database, table_names=none) %}
+{# 
+Print the column snapshot of a schema (see `get_schema_columns()`) as a single line
+of JSON, so that nesso can store it in its local catalog.
+#}
+    {% set schema_columns = get_schema_columns(schema_name, database_name=database_name, table_names=table_names) %}
+    {% if execute %}
+        {{ print(tojson(schema_columns)) }}
+    {% endif %}
 {% endmacro %}
\ No newline at end of file
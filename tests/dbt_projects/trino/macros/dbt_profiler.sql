@@ -1,7 +1,14 @@
 {# Adapted from `dbt_profler` for `databricks` #}
 
-{% macro print_profile_docs(relation=none, relation_name=none, docs_name=none, schema=none, database=none, exclude_measures=[], include_columns=[], exclude_columns=[], max_rows=none, max_columns=13, max_column_width=30, max_precision=none) %}
-{%- set results = get_profile_table(relation=relation, relation_name=relation_name, schema=schema, database=database, exclude_measures=exclude_measures, include_columns=include_columns, exclude_columns=exclude_columns) -%}
+{% macro print_profile_docs(relation=none, relation_name=none, docs_name=none, schema=none, database=none, exclude_measures=[], include_columns=[], exclude_columns=[], max_rows=none, max_columns=13, max_column_width=30, max_precision=none, fast_mode=none, fast_mode_row_threshold=10000000, sample_percent=10, sample_row_limit=1000000) %}
+{%- set relation = dbt_profiler.get_relation(
+  relation=relation,
+  relation_name=relation_name,
+  schema=schema,
+  database=database
+) -%}
+{%- set profile_mode = get_profile_mode(relation, fast_mode=fast_mode, fast_mode_row_threshold=fast_mode_row_threshold) -%}
+{%- set results = get_profile_table(relation=relation, exclude_measures=exclude_measures, include_columns=include_columns, exclude_columns=exclude_columns, fast_mode=profile_mode["fast_mode"], sample_percent=sample_percent, sample_row_limit=sample_row_limit) -%}
 
 {% if docs_name is none %}
   {% set docs_name = schema + "_" + relation_name %}
@@ -19,6 +26,15 @@
   {{ print("") }}
 
   {{ print('### 📊 Profiling') }}
+  {% if profile_mode["fast_mode"] %}
+    {% set distinct_counts_notes = {
+      "approximate": "distinct counts are estimated over the whole table",
+      "catalog": "distinct counts are estimated from the table's statistics",
+      "sample": "distinct counts were computed on a sample of the table"
+    } %}
+    {{ print("_Approximate profile: " ~ distinct_counts_notes[get_distinct_count_method()] ~ ", the other measures were computed on a sample of it, and uniqueness was not checked._") }}
+    {{ print("") }}
+  {% endif %}
   {% do results.print_table(max_rows=max_rows, max_columns=max_columns, max_column_width=max_column_width, max_precision=max_precision) %}
 
   {{ print("") }}
@@ -30,7 +46,7 @@
 {%- endmacro -%}
 
 
-{% macro get_profile_table(relation=none, relation_name=none, schema=none, database=none, exclude_measures=[], include_columns=[], exclude_columns=[]) %}
+{% macro get_profile_table(relation=none, relation_name=none, schema=none, database=none, exclude_measures=[], include_columns=[], exclude_columns=[], fast_mode=none, fast_mode_row_threshold=10000000, sample_percent=10, sample_row_limit=1000000, row_count=none) %}
 
 {%- set relation = dbt_profiler.get_relation(
   relation=relation,
@@ -38,7 +54,11 @@
   schema=schema,
   database=database
 ) -%}
-{%- set profile_sql = get_profile(relation=relation, exclude_measures=exclude_measures, include_columns=include_columns, exclude_columns=exclude_columns) -%}
+{%- if fast_mode is none -%}
+  {%- set profile_mode = get_profile_mode(relation, fast_mode_row_threshold=fast_mode_row_threshold) -%}
+  {%- set fast_mode = profile_mode["fast_mode"] -%}
+{%- endif -%}
+{%- set profile_sql = get_profile(relation=relation, exclude_measures=exclude_measures, include_columns=include_columns, exclude_columns=exclude_columns, fast_mode=fast_mode, sample_percent=sample_percent, sample_row_limit=sample_row_limit, row_count=row_count) -%}
 {{ log(profile_sql, info=False) }}
 {% set results = run_query(profile_sql) %}
 {% set results = results.rename(results.column_names | map('lower')) %}
@@ -52,13 +72,13 @@
 {%- endmacro -%}
 
 
-{% macro get_profile(relation, exclude_measures=[], include_columns=[], exclude_columns=[]) %}
-  {{ return(adapter.dispatch("get_profile", macro_namespace="dbt_profiler")(relation, exclude_measures, include_columns, exclude_columns)) }}
+{% macro get_profile(relation, exclude_measures=[], include_columns=[], exclude_columns=[], fast_mode=False, sample_percent=10, sample_row_limit=1000000, row_count=none) %}
+  {{ return(adapter.dispatch("get_profile", macro_namespace="dbt_profiler")(relation, exclude_measures, include_columns, exclude_columns, fast_mode, sample_percent, sample_row_limit, row_count)) }}
 {% endmacro %}
 
 
 
-{% macro default__get_profile(relation, exclude_measures=[], include_columns=[], exclude_columns=[]) %}
+{% macro default__get_profile(relation, exclude_measures=[], include_columns=[], exclude_columns=[], fast_mode=False, sample_percent=10, sample_row_limit=1000000, row_count=none) %}
 
 {%- if include_columns and exclude_columns -%}
     {{ exceptions.raise_compiler_error("Both include_columns and exclude_columns arguments were provided to the `get_profile` macro. Only one is allowed.") }}
@@ -109,67 +129,7 @@
   {% endfor %}
   {{ log("Column data types: " ~ data_type_map, info=False) }}
 
-  {% set profile_sql %}
-    with source_data as (
-      select
-        *
-      from {{ relation }}
-    ),
-
-    column_profiles as (
-      {% for column_name in profile_column_names %}
-        {% set data_type = data_type_map.get(column_name.lower(), "") %}
-        select 
-          lower('{{ column_name }}') as column_name,
-          nullif(lower('{{ data_type }}'), '') as data_type,
-          {% if "row_count" not in exclude_measures -%}
-            cast(count(*) as numeric) as row_count,
-          {%- endif %}
-          {% if "not_null_proportion" not in exclude_measures -%}
-            sum(case when {{ adapter.quote(column_name) }} is null then 0 else 1 end) / cast(count(*) as numeric) as not_null_proportion,
-          {%- endif %}
-          {% if "distinct_proportion" not in exclude_measures -%}
-            count(distinct {{ adapter.quote(column_name) }}) / cast(count(*) as numeric) as distinct_proportion,
-          {%- endif %}
-          {% if "distinct_count" not in exclude_measures -%}
-            count(distinct {{ adapter.quote(column_name) }}) as distinct_count,
-          {%- endif %}
-          {% if "is_unique" not in exclude_measures -%}
-            count(distinct {{ adapter.quote(column_name) }}) = count(*) as is_unique,
-          {%- endif %}
-          {% if "min" not in exclude_measures -%}
-            {% if dbt_profiler.is_numeric_dtype(data_type) or dbt_profiler.is_date_or_time_dtype(data_type) %}cast(min({{ adapter.quote(column_name) }}) as {{ dbt_profiler.type_string() }}){% else %}null{% endif %} as min,
-          {%- endif %}
-          {% if "max" not in exclude_measures -%}
-            {% if dbt_profiler.is_numeric_dtype(data_type) or dbt_profiler.is_date_or_time_dtype(data_type) %}cast(max({{ adapter.quote(column_name) }}) as {{ dbt_profiler.type_string() }}){% else %}null{% endif %} as max,
-          {%- endif %}
-          {% if "avg" not in exclude_measures -%}
-            {% if dbt_profiler.is_numeric_dtype(data_type) %}avg({{ adapter.quote(column_name) }}){% else %}cast(null as numeric){% endif %} as avg,
-          {%- endif %}
-          {% if "std_dev_population" not in exclude_measures -%}
-            {% if dbt_profiler.is_numeric_dtype(data_type) %}stddev_pop({{ adapter.quote(column_name) }}){% else %}cast(null as numeric){% endif %} as std_dev_population,
-          {%- endif %}
-          {% if "std_dev_sample" not in exclude_measures -%}
-            {% if dbt_profiler.is_numeric_dtype(data_type) %}stddev_samp({{ adapter.quote(column_name) }}){% else %}cast(null as numeric){% endif %} as std_dev_sample,
-          {%- endif %}
-          cast(current_timestamp as {{ dbt_profiler.type_string() }}) as profiled_at,
-          {{ loop.index }} as _column_position
-        from source_data
-
-        {% if not loop.last %}union all{% endif %}
-      {% endfor %}
-    )
-
-    select
-      column_name,
-      data_type,
-      {% for measure in include_measures %}
-        {{ measure }},
-      {% endfor %}
-      profiled_at
-    from column_profiles
-    order by _column_position asc
-  {% endset %}
+  {% set profile_sql = get_profile_sql(relation, profile_column_names, data_type_map, exclude_measures, include_measures, fast_mode=fast_mode, sample_percent=sample_percent, sample_row_limit=sample_row_limit, row_count=row_count) %}
 
   {% do return(profile_sql) %}
 {% endif %}
@@ -178,7 +138,7 @@
 
 
 
-{% macro databricks__get_profile(relation, exclude_measures=[], include_columns=[], exclude_columns=[]) %}
+{% macro databricks__get_profile(relation, exclude_measures=[], include_columns=[], exclude_columns=[], fast_mode=False, sample_percent=10, sample_row_limit=1000000, row_count=none) %}
 
 {%- if include_columns and exclude_columns -%}
     {{ exceptions.raise_compiler_error("Both include_columns and exclude_columns arguments were provided to the `get_profile` macro. Only one is allowed.") }}
@@ -234,52 +194,177 @@
   {% endfor %}
   {{ log("Column data types: " ~ data_type_map, info=False) }}
 
-  {% set profile_sql %}
+  {% set profile_sql = get_profile_sql(relation, profile_column_names, data_type_map, exclude_measures, include_measures, fast_mode=fast_mode, sample_percent=sample_percent, sample_row_limit=sample_row_limit, row_count=row_count) %}
+
+  {# {{ print(profile_sql) }} #}
+
+  {% do return(profile_sql) %}
+{% endif %}
+
+{% endmacro %}
+
+{% macro get_profile_sql(relation, profile_column_names, data_type_map, exclude_measures=[], include_measures=[], columns_per_scan=100, fast_mode=False, sample_percent=10, sample_row_limit=1000000, row_count=none) %}
+{#
+Build a profiling query which computes the measures of all columns in a single scan
+of the relation (one scan per `columns_per_scan` columns), and then unpivots the
+single-row result into one row per column.
+
+Each single-row aggregate is referenced only once, and unpivoted by cross joining it
+with the list of its column positions. Referencing it once per column would make
+warehouses which inline CTEs (eg. Trino or Spark) run the aggregate again for every
+column.
+
+`columns_per_scan` keeps the number of aggregates per query within the warehouse's
+limits (eg. Postgres allows at most 1664 entries in a select list).
+
+In `fast_mode`, the measures are computed on a sample of the relation. Columns of
+different batches may then come from different samples. Distinct counts are obtained
+with the warehouse's `get_distinct_count_method()`:
+- "approximate": estimated in one pass over the whole relation, which also counts its
+  rows,
+- "catalog": estimated from column statistics, without scanning the relation,
+- "sample": counted exactly on the sample, so they're relative to the sample.
+Uniqueness can't be told from an estimate nor a sample, so `is_unique` is null.
+Pass the exact `row_count` of the relation, if it's already known (eg. from its
+signature), so that it's used instead of a catalog estimate or another scan.
+#}
+
+{%- set compute_distinct = "distinct_proportion" not in exclude_measures or "distinct_count" not in exclude_measures or "is_unique" not in exclude_measures -%}
+{%- set distinct_count_method = get_distinct_count_method() if fast_mode else "exact" -%}
+{#- In fast mode, proportions of the sampled measures are relative to the sample's row count. -#}
+{%- set measured_row_count = "_sample_row_count" if fast_mode else "_row_count" -%}
+{%- set distinct_row_count = "_sample_row_count" if distinct_count_method == "sample" else "_row_count" -%}
+
+{% set profile_sql %}
     with source_data as (
+      {% if fast_mode %}
+      {{ get_table_sample_sql(relation, sample_percent=sample_percent, sample_row_limit=sample_row_limit) }}
+      {% else %}
       select
         *
       from {{ relation }}
+      {% endif %}
     ),
 
-    column_profiles as (
-      {% for column_name in profile_column_names %}
-        {% set data_type = data_type_map.get(column_name.lower(), "") %}
-        select 
-          lower('{{ column_name }}') as column_name,
-          nullif(lower('{{ data_type }}'), '') as data_type,
-          {% if "row_count" not in exclude_measures -%}
-            cast(count(*) as numeric) as row_count,
-          {%- endif %}
+    {% for batch in profile_column_names | batch(columns_per_scan) %}
+    {% set batch_index = loop.index %}
+    column_aggregates_{{ batch_index }} as (
+      select
+        {% for column_name in batch %}
+          {% set data_type = data_type_map.get(column_name.lower(), "") %}
+          {% set column_index = (batch_index - 1) * columns_per_scan + loop.index %}
           {% if "not_null_proportion" not in exclude_measures -%}
-            sum(case when {{ adapter.quote(column_name) }} is null then 0 else 1 end) / cast(count(*) as numeric) as not_null_proportion,
+            sum(case when {{ adapter.quote(column_name) }} is null then 0 else 1 end) as _not_null_count_{{ column_index }},
           {%- endif %}
-          {% if "distinct_proportion" not in exclude_measures -%}
-            count(distinct {{ adapter.quote(column_name) }}) / cast(count(*) as numeric) as distinct_proportion,
+          {% if compute_distinct and distinct_count_method in ["exact", "sample"] -%}
+            count(distinct {{ adapter.quote(column_name) }}) as _distinct_count_{{ column_index }},
           {%- endif %}
-          {% if "distinct_count" not in exclude_measures -%}
-            count(distinct {{ adapter.quote(column_name) }}) as distinct_count,
+          {% if "min" not in exclude_measures and (dbt_profiler.is_numeric_dtype(data_type) or dbt_profiler.is_date_or_time_dtype(data_type)) -%}
+            cast(min({{ adapter.quote(column_name) }}) as {{ dbt_profiler.type_string() }}) as _min_{{ column_index }},
           {%- endif %}
-          {% if "is_unique" not in exclude_measures -%}
-            count(distinct {{ adapter.quote(column_name) }}) = count(*) as is_unique,
+          {% if "max" not in exclude_measures and (dbt_profiler.is_numeric_dtype(data_type) or dbt_profiler.is_date_or_time_dtype(data_type)) -%}
+            cast(max({{ adapter.quote(column_name) }}) as {{ dbt_profiler.type_string() }}) as _max_{{ column_index }},
           {%- endif %}
-          {% if "min" not in exclude_measures -%}
-            {% if dbt_profiler.is_numeric_dtype(data_type) or dbt_profiler.is_date_or_time_dtype(data_type) %}cast(min({{ adapter.quote(column_name) }}) as {{ dbt_profiler.type_string() }}){% else %}null{% endif %} as min,
+          {% if "avg" not in exclude_measures and dbt_profiler.is_numeric_dtype(data_type) -%}
+            avg({{ adapter.quote(column_name) }}) as _avg_{{ column_index }},
           {%- endif %}
-          {% if "max" not in exclude_measures -%}
-            {% if dbt_profiler.is_numeric_dtype(data_type) or dbt_profiler.is_date_or_time_dtype(data_type) %}cast(max({{ adapter.quote(column_name) }}) as {{ dbt_profiler.type_string() }}){% else %}null{% endif %} as max,
+          {% if "std_dev_population" not in exclude_measures and dbt_profiler.is_numeric_dtype(data_type) -%}
+            stddev_pop({{ adapter.quote(column_name) }}) as _std_dev_population_{{ column_index }},
           {%- endif %}
-          {% if "avg" not in exclude_measures -%}
-            {% if dbt_profiler.is_numeric_dtype(data_type) %}avg({{ adapter.quote(column_name) }}){% else %}cast(null as numeric){% endif %} as avg,
+          {% if "std_dev_sample" not in exclude_measures and dbt_profiler.is_numeric_dtype(data_type) -%}
+            stddev_samp({{ adapter.quote(column_name) }}) as _std_dev_sample_{{ column_index }},
           {%- endif %}
-          {% if "std_dev_population" not in exclude_measures -%}
-            {% if dbt_profiler.is_numeric_dtype(data_type) %}stddev_pop({{ adapter.quote(column_name) }}){% else %}cast(null as numeric){% endif %} as std_dev_population,
+        {% endfor %}
+        cast(count(*) as numeric) as {{ measured_row_count }}
+      from source_data
+    ),
+
+    {% if fast_mode %}
+    distinct_counts_{{ batch_index }} as (
+      {% if distinct_count_method == "approximate" %}
+      select
+        {% for column_name in batch %}
+          {% if compute_distinct -%}
+            {{ approx_count_distinct(adapter.quote(column_name)) }} as _distinct_count_{{ (batch_index - 1) * columns_per_scan + loop.index }},
           {%- endif %}
-          {% if "std_dev_sample" not in exclude_measures -%}
-            {% if dbt_profiler.is_numeric_dtype(data_type) %}stddev_samp({{ adapter.quote(column_name) }}){% else %}cast(null as numeric){% endif %} as std_dev_sample,
+        {% endfor %}
+        cast(count(*) as numeric) as _row_count
+      from {{ relation }}
+      {% elif distinct_count_method == "catalog" %}
+      {{ get_catalog_distinct_counts_sql(relation, batch if compute_distinct else [], first_column_index=(batch_index - 1) * columns_per_scan + 1, row_count=row_count) }}
+      {% elif row_count is not none %}
+      select
+        cast({{ row_count }} as numeric) as _row_count
+      {% else %}
+      select
+        cast(count(*) as numeric) as _row_count
+      from {{ relation }}
+      {% endif %}
+    ),
+    {% endif %}
+    {% endfor %}
+
+    column_profiles as (
+      {% for batch in profile_column_names | batch(columns_per_scan) %}
+      {% set batch_index = loop.index %}
+      {% set measures = {
+        "column_name": [],
+        "data_type": [],
+        "not_null_proportion": [],
+        "distinct_proportion": [],
+        "distinct_count": [],
+        "is_unique": [],
+        "min": [],
+        "max": [],
+        "avg": [],
+        "std_dev_population": [],
+        "std_dev_sample": []
+      } %}
+      {% for column_name in batch %}
+        {% set data_type = data_type_map.get(column_name.lower(), "") %}
+        {% set column_index = (batch_index - 1) * columns_per_scan + loop.index %}
+        {% do measures["column_name"].append([column_index, "lower('" ~ column_name ~ "')"]) %}
+        {% do measures["data_type"].append([column_index, "nullif(lower('" ~ data_type ~ "'), '')"]) %}
+        {% do measures["not_null_proportion"].append([column_index, "_not_null_count_" ~ column_index ~ " / " ~ measured_row_count]) %}
+        {% do measures["distinct_proportion"].append([column_index, "_distinct_count_" ~ column_index ~ " / " ~ distinct_row_count]) %}
+        {% do measures["distinct_count"].append([column_index, "_distinct_count_" ~ column_index]) %}
+        {% if not fast_mode %}
+          {% do measures["is_unique"].append([column_index, "_distinct_count_" ~ column_index ~ " = _row_count"]) %}
+        {% endif %}
+        {% if dbt_profiler.is_numeric_dtype(data_type) or dbt_profiler.is_date_or_time_dtype(data_type) %}
+          {% do measures["min"].append([column_index, "_min_" ~ column_index]) %}
+          {% do measures["max"].append([column_index, "_max_" ~ column_index]) %}
+        {% endif %}
+        {% if dbt_profiler.is_numeric_dtype(data_type) %}
+          {% do measures["avg"].append([column_index, "_avg_" ~ column_index]) %}
+          {% do measures["std_dev_population"].append([column_index, "_std_dev_population_" ~ column_index]) %}
+          {% do measures["std_dev_sample"].append([column_index, "_std_dev_sample_" ~ column_index]) %}
+        {% endif %}
+      {% endfor %}
+        select
+          {{ get_profile_measure_sql(measures["column_name"]) }} as column_name,
+          {{ get_profile_measure_sql(measures["data_type"]) }} as data_type,
+          {% if "row_count" not in exclude_measures -%}
+            _row_count as row_count,
           {%- endif %}
+          {% for measure in ["not_null_proportion", "distinct_proportion", "distinct_count", "min", "max"] if measure not in exclude_measures -%}
+            {{ get_profile_measure_sql(measures[measure]) }} as {{ measure }},
+          {% endfor %}
+          {% if "is_unique" not in exclude_measures -%}
+            {{ get_profile_measure_sql(measures["is_unique"], null_expression="cast(null as boolean)") }} as is_unique,
+          {%- endif %}
+          {% for measure in ["avg", "std_dev_population", "std_dev_sample"] if measure not in exclude_measures -%}
+            {{ get_profile_measure_sql(measures[measure], null_expression="cast(null as numeric)") }} as {{ measure }},
+          {% endfor %}
           cast(current_timestamp as {{ dbt_profiler.type_string() }}) as profiled_at,
-          {{ loop.index }} as _column_position
-        from source_data
+          _column_position
+        from column_aggregates_{{ batch_index }}
+        {% if fast_mode %}
+        cross join distinct_counts_{{ batch_index }}
+        {% endif %}
+        cross join (
+          values {% for column_name in batch %}({{ (batch_index - 1) * columns_per_scan + loop.index }}){{ ", " if not loop.last }}{% endfor %}
+        ) as column_positions (_column_position)
 
         {% if not loop.last %}union all{% endif %}
       {% endfor %}
@@ -294,11 +379,309 @@
       profiled_at
     from column_profiles
     order by _column_position asc
+{% endset %}
+
+{% do return(profile_sql) %}
+
+{% endmacro %}
+
+
+{# Pick the value of a measure for each column position of an unpivoted aggregate. #}
+{% macro get_profile_measure_sql(expressions_by_position, null_expression="null") %}
+{%- if expressions_by_position -%}
+  case _column_position
+    {%- for position, expression in expressions_by_position %} when {{ position }} then {{ expression }}{% endfor %}
+    else {{ null_expression }}
+  end
+{%- else -%}
+  {{ null_expression }}
+{%- endif -%}
+{% endmacro %}
+
+
+{% macro get_profile_mode(relation, fast_mode=none, fast_mode_row_threshold=10000000) %}
+{#
+Decide whether to profile a relation in fast mode (sampled, with approximate
+distinct counts).
+
+Unless `fast_mode` is set explicitly, fast mode is used for relations whose row
+count, as estimated from catalog statistics, exceeds `fast_mode_row_threshold`.
+Warehouses without such statistics are never profiled in fast mode automatically.
+
+Returns: Dict[str, Any]
+
+Example:
+>>> {{ get_profile_mode(relation, fast_mode_row_threshold=1000000) }}
+>>> {"fast_mode": True, "row_count_estimate": 25000000}
+#}
+  {% set row_count_estimate = get_estimated_row_count(relation) if execute else none %}
+
+  {% if fast_mode is none %}
+    {% set fast_mode = row_count_estimate is not none and row_count_estimate > fast_mode_row_threshold %}
+  {% endif %}
+
+  {{ log("Profiling " ~ relation ~ " in " ~ ("fast" if fast_mode else "exact") ~ " mode (estimated row count: " ~ row_count_estimate ~ ").", info=False) }}
+
+  {% do return({"fast_mode": fast_mode, "row_count_estimate": row_count_estimate}) %}
+{% endmacro %}
+
+
+{# Estimate the row count of a relation from catalog statistics, without scanning it. #}
+{% macro get_estimated_row_count(relation) %}
+  {{ return(adapter.dispatch("get_estimated_row_count")(relation)) }}
+{% endmacro %}
+
+{% macro default__get_estimated_row_count(relation) %}
+  {% do return(none) %}
+{% endmacro %}
+
+{% macro postgres__get_estimated_row_count(relation) %}
+  {% set row_count_sql %}
+    select c.reltuples::bigint as row_count
+    from pg_class c
+    join pg_namespace n on n.oid = c.relnamespace
+    where n.nspname = '{{ relation.schema }}'
+      and c.relname = '{{ relation.identifier }}'
   {% endset %}
+  {% set results = run_query(row_count_sql) %}
+  {# `reltuples` is -1 for tables which have never been vacuumed or analyzed. #}
+  {% if results.rows | length == 0 or results.rows[0][0] is none or results.rows[0][0] < 0 %}
+    {% do return(none) %}
+  {% endif %}
+  {% do return(results.rows[0][0]) %}
+{% endmacro %}
 
-  {# {{ print(profile_sql) }} #}
+{% macro trino__get_estimated_row_count(relation) %}
+  {% set results = run_query("show stats for " ~ relation) %}
+  {% set results = results.rename(results.column_names | map('lower')) %}
+  {# The summary row, with no column name, holds the table's row count. #}
+  {% for row in results.rows if row["column_name"] is none %}
+    {% if row["row_count"] is not none %}
+      {% do return(row["row_count"] | int) %}
+    {% endif %}
+  {% endfor %}
+  {% do return(none) %}
+{% endmacro %}
 
-  {% do return(profile_sql) %}
-{% endif %}
 
-{% endmacro %}
\ No newline at end of file
+{# Select a sample of the rows of a relation. #}
+{% macro get_table_sample_sql(relation, sample_percent=10, sample_row_limit=1000000) %}
+  {{ return(adapter.dispatch("get_table_sample_sql")(relation, sample_percent, sample_row_limit)) }}
+{% endmacro %}
+
+{% macro default__get_table_sample_sql(relation, sample_percent, sample_row_limit) %}
+  select * from {{ relation }} limit {{ sample_row_limit }}
+{% endmacro %}
+
+{% macro postgres__get_table_sample_sql(relation, sample_percent, sample_row_limit) %}
+  select * from {{ relation }} tablesample system ({{ sample_percent }})
+{% endmacro %}
+
+{% macro trino__get_table_sample_sql(relation, sample_percent, sample_row_limit) %}
+  select * from {{ relation }} tablesample system ({{ sample_percent }})
+{% endmacro %}
+
+
+{#
+How distinct counts are obtained in fast mode: "approximate" (estimated over the whole
+relation), "catalog" (estimated from column statistics) or "sample" (counted on the
+sample, for warehouses which can neither estimate them nor afford an exact count).
+#}
+{% macro get_distinct_count_method() %}
+  {{ return(adapter.dispatch("get_distinct_count_method")()) }}
+{% endmacro %}
+
+{% macro default__get_distinct_count_method() %}
+  {% do return("sample") %}
+{% endmacro %}
+
+{% macro postgres__get_distinct_count_method() %}
+  {% do return("catalog") %}
+{% endmacro %}
+
+{% macro trino__get_distinct_count_method() %}
+  {% do return("approximate") %}
+{% endmacro %}
+
+{% macro databricks__get_distinct_count_method() %}
+  {% do return("approximate") %}
+{% endmacro %}
+
+
+{#
+Select the distinct counts of some columns of a relation (as `_distinct_count_<index>`,
+numbered from `first_column_index`) and its row count (as `_row_count`), as estimated
+from catalog statistics. If the exact `row_count` is provided, it's used instead of the
+estimate.
+#}
+{% macro get_catalog_distinct_counts_sql(relation, column_names, first_column_index=1, row_count=none) %}
+  {{ return(adapter.dispatch("get_catalog_distinct_counts_sql")(relation, column_names, first_column_index, row_count)) }}
+{% endmacro %}
+
+{% macro default__get_catalog_distinct_counts_sql(relation, column_names, first_column_index, row_count) %}
+  {{ exceptions.raise_compiler_error("Distinct counts can't be estimated from the catalog on " ~ adapter.type() ~ ".") }}
+{% endmacro %}
+
+{% macro postgres__get_catalog_distinct_counts_sql(relation, column_names, first_column_index, row_count) %}
+  {#
+  A negative `n_distinct` is the number of distinct values divided by the row count,
+  used when the number of distinct values grows with the table. Columns which haven't
+  been analyzed yet have no statistics, so their distinct count is null. So is the row
+  count of a table which has never been analyzed.
+  #}
+  select
+    {% for column_name in column_names %}
+      round(max(
+        case
+          when column_stats.attname = '{{ column_name }}' and column_stats.n_distinct >= 0
+            then cast(column_stats.n_distinct as numeric)
+          when column_stats.attname = '{{ column_name }}'
+            then -cast(column_stats.n_distinct as numeric) * table_stats._row_count
+        end
+      )) as _distinct_count_{{ first_column_index + loop.index0 }},
+    {% endfor %}
+    max(table_stats._row_count) as _row_count
+  from (
+    select
+      {% if row_count is not none -%}
+        cast({{ row_count }} as numeric) as _row_count
+      {%- else -%}
+        cast(case when c.reltuples > 0 then c.reltuples end as numeric) as _row_count
+      {%- endif %}
+    from pg_class c
+    join pg_namespace n on n.oid = c.relnamespace
+    where n.nspname = '{{ relation.schema }}'
+      and c.relname = '{{ relation.identifier }}'
+  ) as table_stats
+  left join pg_stats as column_stats
+    on column_stats.schemaname = '{{ relation.schema }}'
+    and column_stats.tablename = '{{ relation.identifier }}'
+{% endmacro %}
+
+
+{# Count distinct values of an expression, approximately where the warehouse supports it. #}
+{% macro approx_count_distinct(expression) %}
+  {{ return(adapter.dispatch("approx_count_distinct")(expression)) }}
+{% endmacro %}
+
+{% macro default__approx_count_distinct(expression) %}
+  count(distinct {{ expression }})
+{% endmacro %}
+
+{% macro trino__approx_count_distinct(expression) %}
+  approx_distinct({{ expression }})
+{% endmacro %}
+
+{% macro databricks__approx_count_distinct(expression) %}
+  approx_count_distinct({{ expression }})
+{% endmacro %}
+
+
+{% macro get_profile_signature(relation, loaded_at_field=none) %}
+{#
+Get a cheap change signature of a relation: its column set, row count and, if
+`loaded_at_field` is provided, the latest load time.
+
+A stored profile can be reused as long as the relation's signature hasn't changed.
+The row count is always exact, even for relations profiled in fast mode: catalog
+estimates are only refreshed by the warehouse's statistics jobs, so they can stay the
+same across loads.
+
+Returns: Dict[str, Any]
+
+Example:
+>>> {{ get_profile_signature(relation, loaded_at_field="_viadot_downloaded_at_utc") }}
+>>> {"relation": "public.contact", "columns": ["id", "name"], "row_count": 100, "max_loaded_at": "2023-01-01 00:00:00"}
+#}
+  {% if execute %}
+    {% set columns = adapter.get_columns_in_relation(relation) | map(attribute="name") | map("lower") | list %}
+
+    {% set signature_sql %}
+      select
+        count(*) as row_count,
+        {% if loaded_at_field %}cast(max({{ loaded_at_field }}) as {{ dbt_profiler.type_string() }}){% else %}null{% endif %} as max_loaded_at
+      from {{ relation }}
+    {% endset %}
+    {% set results = run_query(signature_sql) %}
+    {% set max_loaded_at = results.rows[0][1] %}
+
+    {% do return({
+      "relation": relation | string,
+      "columns": columns,
+      "row_count": results.rows[0][0] | int,
+      "max_loaded_at": max_loaded_at | string if max_loaded_at is not none else none
+    }) %}
+  {% endif %}
+{% endmacro %}
+
+
+{% macro print_profile_signature(relation=none, relation_name=none, schema=none, database=none, loaded_at_field=none) %}
+{#
+Print the change signature of a relation as a single line of JSON, so that nesso can
+compare it with the signature of a stored profile before profiling the relation again.
+
+Example:
+>>> dbt run-operation print_profile_signature --args '{"relation_name": "contact", "schema": "public", "loaded_at_field": "_viadot_downloaded_at_utc"}'
+>>> {"relation": "public.contact", "columns": ["id", "name"], "row_count": 100, "max_loaded_at": "2023-01-01 00:00:00"}
+#}
+{%- set relation = dbt_profiler.get_relation(
+  relation=relation,
+  relation_name=relation_name,
+  schema=schema,
+  database=database
+) -%}
+
+{% if execute %}
+  {%- set signature = get_profile_signature(relation, loaded_at_field=loaded_at_field) -%}
+  {{ print(tojson(signature)) }}
+{%- endif -%}
+{%- endmacro -%}
+
+
+{% macro print_profile_json(relation=none, relation_name=none, schema=none, database=none, loaded_at_field=none, exclude_measures=[], include_columns=[], exclude_columns=[], fast_mode=none, fast_mode_row_threshold=10000000, sample_percent=10, sample_row_limit=1000000) %}
+{#
+Print the profile of a relation, along with its change signature, as a single line
+of JSON, so that nesso can keep it in its local profile store and skip profiling
+the relation again until the signature changes.
+
+Example:
+>>> dbt run-operation print_profile_json --args '{"relation_name": "contact", "schema": "public"}'
+>>> {"signature": {"relation": "public.contact", ...}, "fast_mode": false, "distinct_count_method": "exact", "profile": [{"column_name": "id", ...}]}
+#}
+{%- set relation = dbt_profiler.get_relation(
+  relation=relation,
+  relation_name=relation_name,
+  schema=schema,
+  database=database
+) -%}
+
+{% if execute %}
+  {%- set profile_mode = get_profile_mode(relation, fast_mode=fast_mode, fast_mode_row_threshold=fast_mode_row_threshold) -%}
+  {%- set signature = get_profile_signature(relation, loaded_at_field=loaded_at_field) -%}
+  {#- Reuse the signature's exact row count, so that the profile's agrees with it. -#}
+  {%- set results = get_profile_table(relation=relation, exclude_measures=exclude_measures, include_columns=include_columns, exclude_columns=exclude_columns, fast_mode=profile_mode["fast_mode"], sample_percent=sample_percent, sample_row_limit=sample_row_limit, row_count=signature["row_count"]) -%}
+
+  {% set profile = [] %}
+  {% for row in results.rows %}
+    {% set column_profile = {} %}
+    {% for column_name in results.column_names %}
+      {% set value = row[column_name] %}
+      {# Keep measures numeric; agate returns all numbers as decimals, which JSON can't encode. #}
+      {% if value is number and value is not boolean %}
+        {% set value = value | int if value == value | int else value | float %}
+      {% elif value is not none and value is not boolean %}
+        {% set value = value | string %}
+      {% endif %}
+      {% do column_profile.update({column_name: value}) %}
+    {% endfor %}
+    {% do profile.append(column_profile) %}
+  {% endfor %}
+
+  {{ print(tojson({
+    "signature": signature,
+    "fast_mode": profile_mode["fast_mode"],
+    "distinct_count_method": get_distinct_count_method() if profile_mode["fast_mode"] else "exact",
+    "profile": profile
+  })) }}
+{%- endif -%}
+{%- endmacro -%}
@@ -1,14 +1,37 @@
-{% macro generate_base_model(source_name, table_name, project, leading_commas=False, case_sensitive_cols=False) %}
+{% macro get_base_model_sql(source_name, table_name, project, leading_commas=False, case_sensitive_cols=False, column_names=none, pii_columns=none, materialization="view", unique_key=none) %}
 
-{%- set source_relation = source(source_name, table_name) -%}
+{%- if column_names is none -%}
+    {%- set source_relation = source(source_name, table_name) -%}
+    {%- set columns = adapter.get_columns_in_relation(source_relation) -%}
+    {%- set column_names = columns | map(attribute='name') | list -%}
+{%- endif -%}
 
-{%- set columns = adapter.get_columns_in_relation(source_relation) -%}
-{%- set column_names=columns | map(attribute='name') -%}
+{%- if pii_columns is none -%}
+    {%- set pii_columns = get_source_pii_columns(project=project, schema=source_name, table=table_name) -%}
+{%- endif -%}
+
+{#
+Incremental base models only hash and rename new rows, using the source's
+`loaded_at_field` as the watermark.
+#}
+{%- if materialization == "incremental" -%}
+    {%- set source_node = graph.sources.get("source." ~ project ~ "." ~ source_name ~ "." ~ table_name, {}) -%}
+    {%- set loaded_at_field = source_node.get("loaded_at_field") or "_viadot_downloaded_at_utc" -%}
+{%- endif -%}
 
 {%- set base_model_sql -%}
+{% if materialization == "incremental" -%}
+{{ "{{ config(materialized=\"incremental\"" ~ (", unique_key=\"" ~ unique_key ~ "\"" if unique_key else "") ~ ") }}" }}
+
+{% endif -%}
 with _masked as (
-    select {{ hash_source_pii_columns(table=table_name, schema=source_name, project=project ) }}
+    select {{ get_masked_columns_sql(column_names, pii_columns) }}
     from {{ "{{ source(" ~ '"' ~ source_name ~ '"' ~ ", " ~ '"' ~ table_name ~ '"' ~ ") }}" }}
+    {%- if materialization == "incremental" %}
+    {{ "{% if is_incremental() %}" }}
+    where {{ loaded_at_field }} > (select max({{ loaded_at_field }}) from {{ "{{ this }}" }})
+    {{ "{% endif %}" }}
+    {%- endif %}
 ),
 
 renamed as (
@@ -30,9 +53,73 @@ renamed as (
 select * from renamed
 {%- endset -%}
 
+{% do return(base_model_sql) %}
+
+{% endmacro %}
+
+
+{% macro generate_base_model(source_name, table_name, project, leading_commas=False, case_sensitive_cols=False, materialization="view", unique_key=none) %}
+
 {% if execute %}
+    {%- set base_model_sql = get_base_model_sql(source_name, table_name, project, leading_commas=leading_commas, case_sensitive_cols=case_sensitive_cols, materialization=materialization, unique_key=unique_key) -%}
     {{ print(base_model_sql) }}
     {% do return(base_model_sql) %}
 {% endif %}
 
-{% endmacro %}
\ No newline at end of file
+{% endmacro %}
+
+
+{% macro generate_base_models(source_name, project, table_names=none, leading_commas=False, case_sensitive_cols=False, materialization="view", unique_key=none) %}
+{#
+Generate base models for many tables of a source in a single `run-operation`,
+so that dbt starts up and parses the project only once.
+
+Args:
+    source_name (str): The name of the source.
+    project (str): The name of the dbt project.
+    table_names (List[str], optional): The tables for which to generate base models.
+    Defaults to all the tables of the source.
+    materialization (str, optional): Either "view" or "incremental". Incremental base
+    models only process rows newer than the source's `loaded_at_field`. Defaults to "view".
+    unique_key (str, optional): The unique key of incremental base models, used to merge
+    updated rows.
+
+Returns: Dict[str, str]
+
+Example:
+>>> dbt run-operation generate_base_models --args '{"source_name": "public", "project": "postgres"}'
+>>> {"stg_contact": "with _masked as (...", "stg_account": "with _masked as (..."}
+#}
+
+{% if execute %}
+
+    {% if table_names is none %}
+        {% set table_names = graph.sources.values() | selectattr("source_name", "equalto", source_name) | map(attribute="name") | list %}
+    {% endif %}
+
+    {# Fetch the columns of all the tables at once, rather than introspecting each table. #}
+    {% set source_node = graph.sources.values() | selectattr("source_name", "equalto", source_name) | first %}
+    {% set schema_columns = get_schema_columns(source_node.schema, database_name=source_node.database, table_names=table_names) %}
+    {% set pii_registry = get_source_pii_registry(project=project, schema=source_name) %}
+
+    {% set base_models = {} %}
+    {% for table_name in table_names %}
+        {{ log("Generating base model for table '" ~ table_name ~ "' (" ~ loop.index ~ "/" ~ loop.length ~ ")...", info=True) }}
+        {% set table_columns = schema_columns.get(table_name, schema_columns.get(table_name | lower)) %}
+        {% if table_columns is none %}
+            {# Not in the snapshot (eg. the table's name differs in case), so let `get_base_model_sql()` introspect the table. #}
+            {% set column_names = none %}
+        {% else %}
+            {% set column_names = table_columns | map(attribute="name") | list %}
+        {% endif %}
+        {% do base_models.update({
+            "stg_" ~ table_name | lower: get_base_model_sql(source_name, table_name, project, leading_commas=leading_commas, case_sensitive_cols=case_sensitive_cols, column_names=column_names, pii_columns=pii_registry.get(table_name, []), materialization=materialization, unique_key=unique_key)
+        }) %}
+    {% endfor %}
+
+    {{ print(tojson(base_models)) }}
+    {% do return(base_models) %}
+
+{% endif %}
+
+{% endmacro %}
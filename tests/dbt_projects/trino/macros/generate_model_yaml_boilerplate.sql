@@ -48,7 +48,9 @@
     include_sla=True,
     include_pii_tag=False,
     case_sensitive_cols=True,
-    base_model=False
+    base_model=False,
+    graph_index=none,
+    print_yaml=True
     ) %}
 {# 
 Generate model YAML template.
@@ -65,17 +67,24 @@ Args:
     if it is case-sensitive column names will be allowed to contain uppercase letters. Defaults to True.
     base_model (bool, optional):  Determines whether model generation is performed for a base_model. 
     In case of yml file generation for base model, prefix `stg` is needed before the model name. Defaults to False.
+    graph_index (Dict, optional): A graph index (see `get_graph_index()`) to reuse across calls.
+    print_yaml (bool, optional): Whether to print the generated YAML. Defaults to True.
 #}
 
 {{ log("Generaling model YAML for model '" ~ model_name ~ "'...") }}
 
+{# Index the graph once, rather than scanning it in every metadata lookup. #}
+{% if graph_index is none %}
+    {% set graph_index = get_graph_index() %}
+{% endif %}
+
 {% if upstream_metadata %}
-    {% set upstream_model_metadata = get_parent_source_or_model_metadata(model_name) %}
+    {% set upstream_model_metadata = get_parent_source_or_model_metadata(model_name, graph_index=graph_index) %}
 {% else %}
     {% set upstream_model_metadata = {} %}
 {% endif %}
 
-{% set dependencies = get_model_dependencies(model_name) %}
+{% set dependencies = get_model_dependencies(model_name, graph_index=graph_index) %}
 {% set upstream_model_type = dependencies["type"] %}
 
 {# Table metadata. #}
@@ -121,7 +130,7 @@ Args:
 {%- set columns = adapter.get_columns_in_relation(relation) -%}
 
 {# Column metadata. #}
-{% set columns_metadata_dict = get_parent_source_or_model_column_metadata(model_name) if upstream_metadata else {} %}
+{% set columns_metadata_dict = get_parent_source_or_model_column_metadata(model_name, graph_index=graph_index) if upstream_metadata else {} %}
 {% for column in columns %}
     {% set model_yaml = generate_column_yaml(column, model_yaml, columns_metadata_dict, include_pii_tag=False, case_sensitive_cols=True) %}
 {% endfor %}
@@ -129,9 +138,79 @@ Args:
 {%- if execute -%}
 
     {%- set joined = model_yaml | join ('\n') -%}
-    {{ print(joined) }}
+    {%- if print_yaml -%}
+        {{ print(joined) }}
+    {%- endif -%}
     {%- do return(joined) -%}
 
 {%- endif -%}
 
+{%- endmacro -%}
+
+
+{% macro generate_models_yaml(
+    model_names=none,
+    mart=none,
+    project=none,
+    technical_owner=none,
+    business_owner=none,
+    upstream_metadata=True,
+    include_sla=True,
+    include_pii_tag=False,
+    case_sensitive_cols=True
+    ) %}
+{# 
+Generate YAML templates for many models in a single `run-operation`, sharing one
+graph index for all upstream metadata lookups.
+
+Args:
+    model_names (List[str], optional): The models for which to generate templates.
+    Defaults to all models under `models/marts/<mart>/<project>/` which don't have a YAML yet.
+    mart (str, optional): The mart of the models. Required if `model_names` is not provided.
+    project (str, optional): The project of the models. Required if `model_names` is not provided.
+    See `generate_model_yaml()` for the remaining arguments.
+
+Returns: Dict[str, str]
+
+Example:
+>>> dbt run-operation generate_models_yaml --args '{"mart": "sales", "project": "crm"}'
+>>> {"crm_contact": "version: 2...", "crm_account": "version: 2..."}
+#}
+
+{%- if execute -%}
+
+    {% set graph_index = get_graph_index() %}
+
+    {% if model_names is none %}
+        {% if mart is none or project is none %}
+            {{ exceptions.raise_compiler_error("Either `model_names` or both `mart` and `project` must be provided.") }}
+        {% endif %}
+        {% set model_names = [] %}
+        {% set mart_path = "marts/" ~ mart ~ "/" ~ project ~ "/" %}
+        {% for node in graph.nodes.values() if node.resource_type == "model" and node.path.startswith(mart_path) and not node.patch_path %}
+            {% do model_names.append(node.name) %}
+        {% endfor %}
+    {% endif %}
+
+    {% set models_yaml = {} %}
+    {% for model_name in model_names %}
+        {{ log("Generating YAML for model '" ~ model_name ~ "' (" ~ loop.index ~ "/" ~ loop.length ~ ")...", info=True) }}
+        {% do models_yaml.update({model_name: generate_model_yaml(
+            model_name,
+            technical_owner=technical_owner,
+            business_owner=business_owner,
+            upstream_metadata=upstream_metadata,
+            include_sla=include_sla,
+            include_pii_tag=include_pii_tag,
+            case_sensitive_cols=case_sensitive_cols,
+            graph_index=graph_index,
+            print_yaml=False
+        )}) %}
+    {% endfor %}
+
+    {{ print(tojson(models_yaml)) }}
+    {%- do return(models_yaml) -%}
+
+{%- endif -%}
+
 {%- endmacro -%}
\ No newline at end of file
@@ -26,7 +26,10 @@
     include_owners=True,
     technical_owner="",
     business_owner="",
-    case_sensitive_cols=True
+    case_sensitive_cols=True,
+    primary_key=none,
+    columns=none,
+    print_yaml=True
     ) %}
 
     {% set yaml=[] %}
@@ -38,21 +41,31 @@
         {% do yaml.append('    tags: []' ) %}
     {% endif %}
 
-    {% if include_owners %}
+    {% if include_owners or primary_key %}
         {% do yaml.append('    meta:' ) %}
+    {% endif %}
+
+    {% if include_owners %}
         {% do yaml.append('      technical_owner: ' ~ technical_owner)%}
         {% do yaml.append('      business_owner: ' ~ business_owner)%}
     {% endif %}
 
+    {# Used to load only the rows which changed, instead of reloading the whole seed. #}
+    {% if primary_key %}
+        {% do yaml.append('      primary_key: ' ~ primary_key)%}
+    {% endif %}
+
     {% if generate_columns %}
         {% do yaml.append('    columns:') %}
 
-        {% set table_relation=api.Relation.create(
-            database=database_name,
-            schema=schema_name,
-            identifier=seed
-        ) %}
-        {% set columns = adapter.get_columns_in_relation(table_relation) %}
+        {% if columns is none %}
+            {% set table_relation=api.Relation.create(
+                database=database_name,
+                schema=schema_name,
+                identifier=seed
+            ) %}
+            {% set columns = adapter.get_columns_in_relation(table_relation) %}
+        {% endif %}
         {% for column in columns %}
             {% if case_sensitive_cols %}
                 {% do yaml.append('      - name: ' ~ column.name) %}
@@ -72,6 +85,67 @@
 
     {% if execute %}
         {% set joined = yaml | join ('\n') %}
+        {% if print_yaml %}
+            {{ print(joined) }}
+        {% endif %}
+        {% do return(joined) %}
+    {% endif %}
+
+{% endmacro %}
+
+
+{% macro generate_seeds_yaml(
+    seeds,
+    database_name=target.database,
+    schema_name=target.schema,
+    generate_columns=True,
+    include_tags=False,
+    include_owners=True,
+    technical_owner="",
+    business_owner="",
+    case_sensitive_cols=True,
+    primary_keys={}
+    ) %}
+{#
+Generate the YAML entries of many seeds in a single `run-operation`, fetching the
+columns of all of them with one query.
+
+Args:
+    seeds (List[str]): The names of the seeds.
+    primary_keys (Dict[str, str], optional): The primary key column of each seed.
+    See `generate_seed_yaml()` for the remaining arguments.
+#}
+
+    {% if generate_columns %}
+        {% set seeds_columns = get_schema_columns(schema_name, database_name=database_name, table_names=seeds) %}
+    {% endif %}
+
+    {% set entries = [] %}
+    {% for seed in seeds %}
+        {{ log("Generating YAML for seed '" ~ seed ~ "' (" ~ loop.index ~ "/" ~ loop.length ~ ")...", info=True) }}
+        {% if generate_columns %}
+            {% set columns = seeds_columns.get(seed, seeds_columns.get(seed | lower, [])) %}
+        {% else %}
+            {% set columns = [] %}
+        {% endif %}
+        {% do entries.append(generate_seed_yaml(
+            seed,
+            database_name=database_name,
+            schema_name=schema_name,
+            generate_columns=generate_columns,
+            include_tags=include_tags,
+            include_owners=include_owners,
+            technical_owner=technical_owner,
+            business_owner=business_owner,
+            case_sensitive_cols=case_sensitive_cols,
+            primary_key=primary_keys.get(seed),
+            columns=columns,
+            print_yaml=False
+        )) %}
+    {% endfor %}
+
+    {% if execute %}
+        {% set joined = entries | join ('\n') %}
         {{ print(joined) }}
         {% do return(joined) %}
     {% endif %}
@@ -0,0 +1,29 @@
+{% macro get_masked_columns_sql(column_names, pii_columns) -%}
+{#
+Select the given columns, hashing the PII ones.
+
+This takes the precomputed columns and PII columns, so it needs no graph lookups
+nor warehouse introspection. PII columns are matched case-insensitively, and keep the
+case of `column_names`.
+
+PII columns are hashed with `md5()` rather than the dispatched `hash()` macro, so
+that the hashes stay identical to the ones of existing base models (`hash()` uses
+`sha2()` on Databricks), and joins on them keep working.
+#}
+
+    {%- set string_type = api.Column.translate_type("string") -%}
+
+    {%- set pii_columns_lower = pii_columns | map("lower") | list -%}
+
+    {%- set select_list = [] -%}
+    {%- for column in column_names -%}
+        {%- if column | lower in pii_columns_lower -%}
+            {%- do select_list.append("md5(cast(" ~ adapter.quote(column) ~ " as " ~ string_type ~ ")) as " ~ adapter.quote(column)) -%}
+        {%- else -%}
+            {%- do select_list.append(adapter.quote(column)) -%}
+        {%- endif -%}
+    {%- endfor -%}
+
+    {{ select_list | join(",\n        ") }}
+
+{%- endmacro %}
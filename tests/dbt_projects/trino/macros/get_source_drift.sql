@@ -0,0 +1,64 @@
+{% macro get_source_drift(source_name) %}
+{#
+Compare the tables and columns of a source's schema in the warehouse with those
+declared in the source's YAML, using a single `information_schema.columns` query.
+
+This is what allows syncing a source by only adding what has changed, instead of
+regenerating the whole source.
+
+Returns: Dict[str, Any]
+
+Example:
+>>> dbt run-operation get_source_drift --args '{"source_name": "public"}'
+>>> {"new_tables": ["invoice"], "dropped_tables": [], "new_columns": {"contact": ["phone"]}, "dropped_columns": {}}
+#}
+
+{% if execute %}
+
+    {% set source_nodes = graph.sources.values() | selectattr("source_name", "equalto", source_name) | list %}
+    {% if not source_nodes %}
+        {{ exceptions.raise_compiler_error("Source '" ~ source_name ~ "' does not exist.") }}
+    {% endif %}
+
+    {% set schema_columns = get_schema_columns(source_nodes[0].schema, database_name=source_nodes[0].database) %}
+
+    {% set warehouse_columns = {} %}
+    {% for table_name, columns in schema_columns.items() %}
+        {% do warehouse_columns.update({table_name | lower: columns | map(attribute="name") | map("lower") | list}) %}
+    {% endfor %}
+
+    {% set declared_columns = {} %}
+    {% for node in source_nodes %}
+        {% do declared_columns.update({(node.identifier or node.name) | lower: node.columns.keys() | map("lower") | list}) %}
+    {% endfor %}
+
+    {% set drift = {"new_tables": [], "dropped_tables": [], "new_columns": {}, "dropped_columns": {}} %}
+
+    {% for table_name, columns in warehouse_columns.items() %}
+        {% if table_name not in declared_columns %}
+            {% do drift["new_tables"].append(table_name) %}
+        {% elif declared_columns[table_name] %}
+            {# Tables declared without any columns are not checked for column drift. #}
+            {% set new_columns = columns | reject("in", declared_columns[table_name]) | list %}
+            {% set dropped_columns = declared_columns[table_name] | reject("in", columns) | list %}
+            {% if new_columns %}
+                {% do drift["new_columns"].update({table_name: new_columns}) %}
+            {% endif %}
+            {% if dropped_columns %}
+                {% do drift["dropped_columns"].update({table_name: dropped_columns}) %}
+            {% endif %}
+        {% endif %}
+    {% endfor %}
+
+    {% for table_name in declared_columns if table_name not in warehouse_columns %}
+        {% do drift["dropped_tables"].append(table_name) %}
+    {% endfor %}
+
+    {{ log("Source '" ~ source_name ~ "': " ~ drift["new_tables"] | length ~ " new tables, " ~ drift["dropped_tables"] | length ~ " dropped tables, " ~ drift["new_columns"] | length ~ " tables with new columns, " ~ drift["dropped_columns"] | length ~ " tables with dropped columns.", info=True) }}
+
+    {{ print(tojson(drift)) }}
+    {% do return(drift) %}
+
+{% endif %}
+
+{% endmacro %}
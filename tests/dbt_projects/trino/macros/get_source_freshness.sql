@@ -0,0 +1,168 @@
+{% macro get_freshness_threshold_seconds(threshold) %}
+{# Convert a dbt freshness threshold (eg. `{"count": 12, "period": "hour"}`) to seconds. #}
+    {% if not threshold or threshold.get("count") is none or threshold.get("period") is none %}
+        {{ return(none) }}
+    {% endif %}
+    {% set period_seconds = {"minute": 60, "hour": 3600, "day": 86400} %}
+    {{ return(threshold["count"] * period_seconds[threshold["period"]]) }}
+{% endmacro %}
+
+
+{% macro get_source_freshness(source_name=none) %}
+{#
+Check the freshness of all tables of a source (or of all sources) with one query
+per schema, rather than one `max(loaded_at_field)` query per table.
+
+The results are printed in the format of dbt's `sources.json` artifact, so that
+they can be written to `target/sources.json` and used by the same tooling. As in
+`dbt source freshness`, tables without freshness criteria are skipped, empty tables
+are treated as last loaded at 0001-01-01, and ages are measured with the warehouse's
+clock.
+
+Tables which are missing or not accessible (or lack their `loaded_at_field`) are
+reported as runtime errors and left out of the query, so that they don't fail the
+whole schema. The latest load time of each table is cast to a timestamp, so that the
+tables of a schema can be queried together whatever the type of their
+`loaded_at_field`. Any other error, eg. a `loaded_at_field` which can't be cast to a
+timestamp or an invalid `filter`, still fails the query of the whole schema, and with
+it the whole run.
+
+Args:
+    source_name (str, optional): The source to check. Defaults to all sources.
+
+Returns: Dict[str, Any]
+
+Example:
+>>> dbt run-operation get_source_freshness --args '{"source_name": "public"}'
+>>> {"metadata": {...}, "results": [{"unique_id": "source.postgres.public.contact", "status": "pass", ...}], "elapsed_time": 0.5}
+#}
+
+{% if execute %}
+
+    {% set started_at = modules.datetime.datetime.utcnow() %}
+
+    {# Group the tables which have a `loaded_at_field` and freshness criteria by schema. #}
+    {% set nodes_by_schema = {} %}
+    {% for node in graph.sources.values() %}
+        {% set criteria = node.freshness or {} %}
+        {% set has_criteria = get_freshness_threshold_seconds(criteria.get("warn_after")) is not none or get_freshness_threshold_seconds(criteria.get("error_after")) is not none %}
+        {% if (source_name is none or node.source_name == source_name) and node.loaded_at_field and has_criteria %}
+            {% do nodes_by_schema.setdefault(node.database ~ "." ~ node.schema, []).append(node) %}
+        {% endif %}
+    {% endfor %}
+
+    {% set results = [] %}
+    {% for schema, nodes in nodes_by_schema.items() %}
+        {{ log("Checking freshness of " ~ nodes | length ~ " tables in schema '" ~ schema ~ "'...", info=True) }}
+
+        {% set schema_started_at = modules.datetime.datetime.utcnow() %}
+
+        {# A missing or inaccessible table would fail the whole query, so only query the tables which can be read. #}
+        {% set schema_columns = get_schema_columns(nodes[0].schema, database_name=nodes[0].database, table_names=nodes | map(attribute="identifier") | list) %}
+        {% set queried_nodes = [] %}
+        {% for node in nodes %}
+            {% set relation_name = node.database ~ "." ~ node.schema ~ "." ~ node.identifier %}
+            {% set column_names = schema_columns.get(node.identifier, []) | map(attribute="name") | map("lower") | list %}
+            {% if not column_names %}
+                {% do results.append({
+                    "unique_id": node.unique_id,
+                    "error": "Relation " ~ relation_name ~ " does not exist or is not accessible.",
+                    "status": "runtime error"
+                }) %}
+            {# `loaded_at_field` may also be an expression, which can only be checked by running it. #}
+            {% elif modules.re.fullmatch("[A-Za-z_][A-Za-z0-9_]*", node.loaded_at_field) and node.loaded_at_field | lower not in column_names %}
+                {% do results.append({
+                    "unique_id": node.unique_id,
+                    "error": "Column '" ~ node.loaded_at_field ~ "' does not exist in relation " ~ relation_name ~ ".",
+                    "status": "runtime error"
+                }) %}
+            {% else %}
+                {% do queried_nodes.append(node) %}
+            {% endif %}
+        {% endfor %}
+
+        {% set freshness_sql %}
+            {% for node in queried_nodes %}
+            select
+                '{{ node.unique_id }}' as unique_id,
+                cast(max({{ node.loaded_at_field }}) as {{ type_timestamp() }}) as max_loaded_at,
+                {{ current_timestamp() }} as snapshotted_at
+            from {{ source(node.source_name, node.name) }}
+            {% if node.freshness.get("filter") %}
+            where {{ node.freshness["filter"] }}
+            {% endif %}
+            {% if not loop.last %}union all{% endif %}
+            {% endfor %}
+        {% endset %}
+
+        {% set freshness_by_node = {} %}
+        {% if queried_nodes %}
+            {% for row in run_query(freshness_sql).rows %}
+                {% do freshness_by_node.update({row[0]: {"max_loaded_at": row[1], "snapshotted_at": row[2]}}) %}
+            {% endfor %}
+        {% endif %}
+        {% set schema_completed_at = modules.datetime.datetime.utcnow() %}
+
+        {% for node in queried_nodes %}
+            {% set freshness = freshness_by_node[node.unique_id] %}
+            {# Compare in naive UTC. Timestamps without a time zone are assumed to be in UTC. #}
+            {% set timestamps = {} %}
+            {% for name, timestamp in freshness.items() %}
+                {% if timestamp is none %}
+                    {# As in dbt, an empty table counts as last loaded at the earliest possible time. #}
+                    {% set timestamp = modules.datetime.datetime.min %}
+                {% elif timestamp.tzinfo is not none %}
+                    {% set timestamp = timestamp.astimezone(modules.pytz.utc).replace(tzinfo=none) %}
+                {% endif %}
+                {% do timestamps.update({name: timestamp}) %}
+            {% endfor %}
+            {% set time_ago_in_s = (timestamps["snapshotted_at"] - timestamps["max_loaded_at"]).total_seconds() %}
+
+            {% set error_after = get_freshness_threshold_seconds(node.freshness.get("error_after")) %}
+            {% set warn_after = get_freshness_threshold_seconds(node.freshness.get("warn_after")) %}
+            {% if error_after is not none and time_ago_in_s > error_after %}
+                {% set status = "error" %}
+            {% elif warn_after is not none and time_ago_in_s > warn_after %}
+                {% set status = "warn" %}
+            {% else %}
+                {% set status = "pass" %}
+            {% endif %}
+
+            {% do results.append({
+                "unique_id": node.unique_id,
+                "max_loaded_at": timestamps["max_loaded_at"].isoformat() ~ "+00:00",
+                "snapshotted_at": timestamps["snapshotted_at"].isoformat() ~ "+00:00",
+                "max_loaded_at_time_ago_in_s": time_ago_in_s,
+                "status": status,
+                "criteria": node.freshness,
+                "adapter_response": {},
+                "timing": [{
+                    "name": "execute",
+                    "started_at": schema_started_at.isoformat() ~ "Z",
+                    "completed_at": schema_completed_at.isoformat() ~ "Z"
+                }],
+                "thread_id": "Thread-1",
+                "execution_time": (schema_completed_at - schema_started_at).total_seconds()
+            }) %}
+        {% endfor %}
+    {% endfor %}
+
+    {% set completed_at = modules.datetime.datetime.utcnow() %}
+    {% set sources_json = {
+        "metadata": {
+            "dbt_schema_version": "https://schemas.getdbt.com/dbt/sources/v3.json",
+            "dbt_version": dbt_version,
+            "generated_at": completed_at.isoformat() ~ "Z",
+            "invocation_id": invocation_id,
+            "env": {}
+        },
+        "results": results,
+        "elapsed_time": (completed_at - started_at).total_seconds()
+    } %}
+
+    {{ print(tojson(sources_json)) }}
+    {% do return(sources_json) %}
+
+{% endif %}
+
+{% endmacro %}
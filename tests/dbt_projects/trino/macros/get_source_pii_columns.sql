@@ -17,3 +17,37 @@
 	{% endif %}
 
 {% endmacro %}
+
+
+{% macro get_source_pii_registry(project, schema) %}
+{#
+Get the PII columns of all tables of a source in a single walk over the graph,
+so that they don't have to be looked up separately for every base model.
+
+Returns: Dict[str, List[str]]
+
+Example:
+>>> dbt run-operation get_source_pii_registry --args '{"project": "postgres", "schema": "public"}'
+>>> {"contact": ["email", "phone"], "account": []}
+#}
+
+	{% if execute %}
+
+        {% set registry = {} %}
+        {% set fqname_prefix = 'source' ~ '.' ~ project ~ '.' ~ schema ~ '.' %}
+
+        {% for fqname, node in graph.sources.items() if fqname.startswith(fqname_prefix) %}
+            {% set pii_columns = [] %}
+            {% for column, column_values in node['columns'].items() %}
+                {% if 'PII' in column_values['tags'] %}
+                    {% do pii_columns.append(column) %}
+                {% endif %}
+            {% endfor %}
+            {% do registry.update({node['name']: pii_columns}) %}
+        {% endfor %}
+
+        {{ return(registry) }}
+
+	{% endif %}
+
+{% endmacro %}
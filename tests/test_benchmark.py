@@ -0,0 +1,227 @@
+"""
+Performance benchmarks of nesso's commands against a synthetic warehouse.
+
+The benchmarks are skipped unless `NESSO_BENCHMARK=1` is set, eg.:
+
+    NESSO_BENCHMARK=1 NESSO_BENCHMARK_TABLES=1000 NESSO_BENCHMARK_COLUMNS=200 \
+        NESSO_BENCHMARK_ROWS=100000 pytest tests/test_benchmark.py
+
+Timings are written to `benchmark_results.json`. If `benchmark_baseline.json` holds
+timings for the same warehouse size, each command must be at most
+`NESSO_BENCHMARK_TOLERANCE` times slower than its baseline. Set
+`NESSO_BENCHMARK_UPDATE_BASELINE=1` to store the current timings as the baseline.
+"""
+import builtins
+import json
+import os
+import shutil
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+import mock
+import numpy as np
+import pandas as pd
+import pytest
+from conftest import psql_insert_copy
+from dbt.main import handle_and_check
+from getkey import key
+from validate_tables import VALID_SCHEMA_VERSION, collect_table_level_violations
+
+from nesso.base_model import create as create_base_model
+from nesso.common import BASE_MODELS_SCHEMA, DBT_PROJECT_DIR
+from nesso.model import bootstrap, bootstrap_yaml
+from nesso.seed import register
+from nesso.source import create as create_source
+
+pytestmark = pytest.mark.skipif(
+    os.environ.get("NESSO_BENCHMARK") != "1",
+    reason="Set NESSO_BENCHMARK=1 to run the benchmarks.",
+)
+
+BENCHMARK_SOURCE = "benchmark"
+BENCHMARK_TABLES = int(os.environ.get("NESSO_BENCHMARK_TABLES", 10))
+BENCHMARK_COLUMNS = int(os.environ.get("NESSO_BENCHMARK_COLUMNS", 20))
+BENCHMARK_ROWS = int(os.environ.get("NESSO_BENCHMARK_ROWS", 10000))
+BENCHMARK_TOLERANCE = float(os.environ.get("NESSO_BENCHMARK_TOLERANCE", 1.5))
+
+# Rows are generated and loaded in chunks, so that large tables fit in memory.
+BENCHMARK_CHUNK_SIZE = 100000
+
+BENCHMARK_RESULTS_PATH = Path(__file__).parent.joinpath("benchmark_results.json")
+BENCHMARK_BASELINE_PATH = Path(__file__).parent.joinpath("benchmark_baseline.json")
+
+BENCHMARK_SEED_NAME = "benchmark_seed"
+BENCHMARK_SEED_PATH = DBT_PROJECT_DIR.joinpath(
+    "seeds", "master_data", f"{BENCHMARK_SEED_NAME}.csv"
+)
+BENCHMARK_MODEL = "benchmark_model"
+BENCHMARK_MART = "benchmark"
+BENCHMARK_MODEL_PATH = DBT_PROJECT_DIR.joinpath(
+    "models",
+    "marts",
+    BENCHMARK_MART,
+    BENCHMARK_MART,
+    BENCHMARK_MODEL,
+    BENCHMARK_MODEL + ".sql",
+)
+BENCHMARK_BASE_MODEL = "stg_table_0000"
+
+timings = {}
+
+
+@contextmanager
+def timed(operation: str):
+    start = time.perf_counter()
+    yield
+    timings[operation] = time.perf_counter() - start
+
+
+def generate_chunk(table_index: int, first_row: int, nrows: int) -> pd.DataFrame:
+    """Generate `nrows` rows of a synthetic table, one vectorized column at a time."""
+    rng = np.random.default_rng(table_index * BENCHMARK_ROWS + first_row)
+    columns = {"id": np.arange(first_row, first_row + nrows)}
+    for column_index in range(1, BENCHMARK_COLUMNS):
+        column_name = f"column_{column_index:03d}"
+        column_type = column_index % 3
+        if column_type == 0:
+            columns[column_name] = rng.integers(0, 1000000, size=nrows)
+        elif column_type == 1:
+            columns[column_name] = rng.random(size=nrows)
+        else:
+            values = rng.integers(0, 1000, size=nrows).astype(str)
+            columns[column_name] = np.char.add("value_", values)
+    return pd.DataFrame(columns)
+
+
+def get_benchmark_table_names():
+    return [f"table_{table_index:04d}" for table_index in range(BENCHMARK_TABLES)]
+
+
+@pytest.fixture(scope="module")
+def benchmark_warehouse(postgres_connection):
+    postgres_connection.execute(f"DROP SCHEMA IF EXISTS {BENCHMARK_SOURCE} CASCADE;")
+    postgres_connection.execute(f"CREATE SCHEMA {BENCHMARK_SOURCE};")
+
+    with timed("generate_and_load_tables"):
+        for table_index, table_name in enumerate(get_benchmark_table_names()):
+            for first_row in range(0, BENCHMARK_ROWS, BENCHMARK_CHUNK_SIZE):
+                nrows = min(BENCHMARK_CHUNK_SIZE, BENCHMARK_ROWS - first_row)
+                generate_chunk(table_index, first_row, nrows).to_sql(
+                    table_name,
+                    postgres_connection,
+                    schema=BENCHMARK_SOURCE,
+                    if_exists="replace" if first_row == 0 else "append",
+                    index=False,
+                    method=psql_insert_copy,
+                )
+
+    yield
+
+    shutil.rmtree(
+        DBT_PROJECT_DIR.joinpath("models", "sources", BENCHMARK_SOURCE),
+        ignore_errors=True,
+    )
+    shutil.rmtree(
+        DBT_PROJECT_DIR.joinpath("models", BASE_MODELS_SCHEMA), ignore_errors=True
+    )
+    shutil.rmtree(
+        DBT_PROJECT_DIR.joinpath("models", "marts", BENCHMARK_MART),
+        ignore_errors=True,
+    )
+    BENCHMARK_SEED_PATH.unlink(missing_ok=True)
+    postgres_connection.execute(f"DROP VIEW IF EXISTS {BENCHMARK_MODEL};")
+    postgres_connection.execute(f"DROP VIEW IF EXISTS {BENCHMARK_BASE_MODEL};")
+    postgres_connection.execute(f"DROP TABLE IF EXISTS {BENCHMARK_SEED_NAME};")
+    postgres_connection.execute(f"DROP SCHEMA IF EXISTS {BENCHMARK_SOURCE} CASCADE;")
+
+
+def test_benchmark_source_create(benchmark_warehouse):
+    with mock.patch.object(builtins, "input", lambda: key.ENTER):
+        with timed("source_create"):
+            create_source(
+                BENCHMARK_SOURCE,
+                project=DBT_PROJECT_DIR.name,
+                create_base_models=False,
+            )
+
+
+def test_benchmark_base_model_create(benchmark_warehouse):
+    with timed("base_model_create"):
+        for table_name in get_benchmark_table_names():
+            create_base_model(source=BENCHMARK_SOURCE, source_table_name=table_name)
+
+
+def test_benchmark_model_bootstrap_yaml(benchmark_warehouse):
+    bootstrap(BENCHMARK_MODEL, mart=BENCHMARK_MART, project=BENCHMARK_MART)
+    with open(BENCHMARK_MODEL_PATH, "a") as f:
+        f.write("select * from {{ ref('" + BENCHMARK_BASE_MODEL + "') }}")
+
+    _, success = handle_and_check(["run", "-m", f"+{BENCHMARK_MODEL}"])
+    assert success
+
+    with timed("model_bootstrap_yaml"):
+        bootstrap_yaml(
+            model=BENCHMARK_MODEL,
+            mart=BENCHMARK_MART,
+            project=BENCHMARK_MART,
+            technical_owner="test_technical_owner",
+            business_owner="test_business_owner",
+            target="qa",
+        )
+
+
+def test_benchmark_seed_register(benchmark_warehouse):
+    nrows = min(BENCHMARK_ROWS, BENCHMARK_CHUNK_SIZE)
+    generate_chunk(0, 0, nrows).to_csv(BENCHMARK_SEED_PATH, index=False)
+
+    with timed("seed_register"):
+        register(
+            seed=BENCHMARK_SEED_NAME,
+            schema_path=BENCHMARK_SEED_PATH.parent.joinpath("schema.yml"),
+            technical_owner="test_technical_owner",
+            business_owner="test_business_owner",
+            target="qa",
+        )
+
+
+def test_benchmark_metadata_validation(benchmark_warehouse):
+    for operation, use_cache in (
+        ("metadata_validation", False),
+        ("metadata_validation_cold_cache", True),
+        ("metadata_validation_warm_cache", True),
+    ):
+        with timed(operation):
+            collect_table_level_violations(
+                project_dir=str(DBT_PROJECT_DIR),
+                email_domain="",
+                schema_version=VALID_SCHEMA_VERSION,
+                use_cache=use_cache,
+            )
+
+
+def test_benchmark_against_baseline(benchmark_warehouse):
+    configuration = f"{BENCHMARK_TABLES}x{BENCHMARK_COLUMNS}x{BENCHMARK_ROWS}"
+
+    results = {}
+    if BENCHMARK_RESULTS_PATH.exists():
+        results = json.loads(BENCHMARK_RESULTS_PATH.read_text())
+    results[configuration] = timings
+    BENCHMARK_RESULTS_PATH.write_text(json.dumps(results, indent=2))
+
+    baselines = {}
+    if BENCHMARK_BASELINE_PATH.exists():
+        baselines = json.loads(BENCHMARK_BASELINE_PATH.read_text())
+
+    if os.environ.get("NESSO_BENCHMARK_UPDATE_BASELINE") == "1":
+        baselines[configuration] = timings
+        BENCHMARK_BASELINE_PATH.write_text(json.dumps(baselines, indent=2))
+        return
+
+    baseline = baselines.get(configuration, {})
+    regressions = [
+        f"{operation}: {timing:.2f}s (baseline: {baseline[operation]:.2f}s)"
+        for operation, timing in timings.items()
+        if operation in baseline and timing > baseline[operation] * BENCHMARK_TOLERANCE
+    ]
+    assert not regressions, "Performance regressions:\n" + "\n".join(regressions)
@@ -1,8 +1,8 @@
 import builtins
-import os
 import shutil
 
 import mock
+from dbt.main import handle_and_check
 from getkey import key
 
 from nesso.base_model import check_if_base_model_exists
@@ -55,7 +55,9 @@ def test_model_bootstrap_yaml(
     with open(MODEL_PATH, "a") as f:
         f.write("select * from {{ " + "ref( 'stg_" + TEST_TABLE_CONTACT + "' )" + " }}")
 
-    os.system(f"dbt run -m {MODEL}")
+    # Run dbt in-process to avoid paying for a new interpreter and dbt startup.
+    _, success = handle_and_check(["run", "-m", MODEL])
+    assert success
 
     # Bootstrap YAML for the model.
     bootstrap_yaml(
@@ -0,0 +1,277 @@
+import oyaml as yaml
+import pytest
+
+import validate_tables
+from validate_tables import (
+    MIN_FILES_FOR_PARALLEL_VALIDATION,
+    collect_table_level_violations,
+    run_table_level_validation,
+)
+
+EMAIL_DOMAIN = "example.com"
+SCHEMA_VERSION = 2
+
+
+def create_model_yaml(
+    description="A test model.",
+    technical_owner="@data-team",
+    business_owner="owner@example.com",
+    version=SCHEMA_VERSION,
+):
+    return {
+        "version": version,
+        "models": [
+            {
+                "name": "test_model",
+                "description": description,
+                "meta": {
+                    "technical_owner": technical_owner,
+                    "business_owner": business_owner,
+                },
+                "columns": [{"name": "id", "description": "The ID."}],
+            }
+        ],
+    }
+
+
+@pytest.fixture
+def VALIDATED_FILES(monkeypatch):
+    """Records the files which are actually validated, ie. not read from the cache."""
+    validated_files = []
+    get_file_violations = validate_tables.get_file_violations
+
+    def get_file_violations_spy(file_path, *args, **kwargs):
+        validated_files.append(file_path)
+        return get_file_violations(file_path, *args, **kwargs)
+
+    monkeypatch.setattr(validate_tables, "get_file_violations", get_file_violations_spy)
+    yield validated_files
+
+
+@pytest.fixture
+def PROJECT_DIR(tmp_path):
+    project_dir = tmp_path.joinpath("project")
+    project_dir.joinpath("models").mkdir(parents=True)
+    project_dir.joinpath("seeds").mkdir(parents=True)
+
+    dbt_project = {
+        "name": "test_project",
+        "model-paths": ["models"],
+        "seed-paths": ["seeds"],
+        "target-path": "target",
+    }
+    with open(project_dir.joinpath("dbt_project.yml"), "w") as f:
+        yaml.safe_dump(dbt_project, f)
+
+    yield project_dir
+
+
+def write_metadata_file(project_dir, file_name, content):
+    path = project_dir.joinpath("models", file_name)
+    if isinstance(content, bytes):
+        path.write_bytes(content)
+        return str(path.absolute())
+    with open(path, "w") as f:
+        if isinstance(content, str):
+            f.write(content)
+        else:
+            yaml.safe_dump(content, f)
+    return str(path.absolute())
+
+
+def test_collect_table_level_violations_aggregates_files(PROJECT_DIR):
+    valid_path = write_metadata_file(PROJECT_DIR, "valid.yml", create_model_yaml())
+    no_description_path = write_metadata_file(
+        PROJECT_DIR, "no_description.yml", create_model_yaml(description=None)
+    )
+    many_violations_path = write_metadata_file(
+        PROJECT_DIR,
+        "many_violations.yml",
+        create_model_yaml(technical_owner="owner@other.com", version=1),
+    )
+
+    report = collect_table_level_violations(
+        project_dir=str(PROJECT_DIR),
+        email_domain=EMAIL_DOMAIN,
+        schema_version=SCHEMA_VERSION,
+        use_cache=False,
+    )
+
+    assert valid_path not in report
+    assert len(report[no_description_path]) == 1
+    assert "descriptions" in report[no_description_path][0]
+    assert len(report[many_violations_path]) == 2
+
+
+def test_collect_table_level_violations_unparsable_file(PROJECT_DIR):
+    write_metadata_file(PROJECT_DIR, "valid.yml", create_model_yaml())
+    invalid_path = write_metadata_file(PROJECT_DIR, "invalid.yml", "models: [\n")
+
+    report = collect_table_level_violations(
+        project_dir=str(PROJECT_DIR),
+        email_domain=EMAIL_DOMAIN,
+        schema_version=SCHEMA_VERSION,
+        use_cache=False,
+    )
+
+    assert list(report) == [invalid_path]
+    assert report[invalid_path][0].startswith(f"Could not parse {invalid_path}")
+
+
+@pytest.mark.parametrize(
+    "content",
+    ["", {"version": 2, "sources": []}, {"version": 2, "sources": [{"name": "s"}]}],
+)
+def test_collect_table_level_violations_empty_file(PROJECT_DIR, content):
+    empty_path = write_metadata_file(PROJECT_DIR, "empty.yml", content)
+
+    report = collect_table_level_violations(
+        project_dir=str(PROJECT_DIR),
+        email_domain=EMAIL_DOMAIN,
+        schema_version=SCHEMA_VERSION,
+        use_cache=False,
+    )
+
+    assert len(report[empty_path]) == 1
+
+
+@pytest.mark.parametrize(
+    "content, message",
+    [
+        (create_model_yaml(technical_owner=123), "Please insert valid technical owner"),
+        (
+            {"version": 2, "models": [{"name": "m", "meta": "owner@example.com"}]},
+            "Could not parse the tables",
+        ),
+        (
+            {"version": 2, "models": [{"name": "m", "columns": ["id"]}]},
+            "Could not parse the tables",
+        ),
+        ({"version": 2, "models": 1}, "Could not parse the tables"),
+        ({"version": 2, "sources": 1}, "Could not parse the sources"),
+        (b"models: \xff\n", "Could not read"),
+    ],
+)
+def test_collect_table_level_violations_malformed_file(PROJECT_DIR, content, message):
+    valid_path = write_metadata_file(PROJECT_DIR, "valid.yml", create_model_yaml())
+    malformed_path = write_metadata_file(PROJECT_DIR, "malformed.yml", content)
+
+    report = collect_table_level_violations(
+        project_dir=str(PROJECT_DIR),
+        email_domain=EMAIL_DOMAIN,
+        schema_version=SCHEMA_VERSION,
+    )
+
+    assert valid_path not in report
+    assert len(report[malformed_path]) == 1
+    assert report[malformed_path][0].startswith(message)
+
+
+def test_collect_table_level_violations_parallel(PROJECT_DIR):
+    invalid_files_count = 0
+    for i in range(MIN_FILES_FOR_PARALLEL_VALIDATION + 8):
+        is_invalid = i % 3 == 0
+        invalid_files_count += is_invalid
+        content = create_model_yaml(description=None if is_invalid else "A model.")
+        write_metadata_file(PROJECT_DIR, f"model_{i}.yml", content)
+    write_metadata_file(PROJECT_DIR, "invalid.yml", "models: [\n")
+    write_metadata_file(
+        PROJECT_DIR, "malformed.yml", create_model_yaml(technical_owner=123)
+    )
+
+    sequential_report = collect_table_level_violations(
+        project_dir=str(PROJECT_DIR),
+        email_domain=EMAIL_DOMAIN,
+        schema_version=SCHEMA_VERSION,
+        max_workers=1,
+        use_cache=False,
+    )
+    parallel_report = collect_table_level_violations(
+        project_dir=str(PROJECT_DIR),
+        email_domain=EMAIL_DOMAIN,
+        schema_version=SCHEMA_VERSION,
+        max_workers=2,
+        use_cache=False,
+    )
+
+    assert len(sequential_report) == invalid_files_count + 2
+    assert parallel_report == sequential_report
+
+
+def test_run_table_level_validation(PROJECT_DIR):
+    write_metadata_file(PROJECT_DIR, "valid.yml", create_model_yaml())
+
+    assert run_table_level_validation(
+        project_dir=str(PROJECT_DIR),
+        email_domain=EMAIL_DOMAIN,
+        schema_version=SCHEMA_VERSION,
+        use_cache=False,
+    )
+
+    write_metadata_file(PROJECT_DIR, "no_description.yml", create_model_yaml(None))
+    write_metadata_file(PROJECT_DIR, "invalid.yml", "models: [\n")
+
+    with pytest.raises(ValueError, match=r"Found 2 violation\(s\) in 2 file\(s\)"):
+        run_table_level_validation(
+            project_dir=str(PROJECT_DIR),
+            email_domain=EMAIL_DOMAIN,
+            schema_version=SCHEMA_VERSION,
+            use_cache=False,
+        )
+
+
+def test_collect_table_level_violations_cache(PROJECT_DIR, VALIDATED_FILES):
+    valid_path = write_metadata_file(PROJECT_DIR, "valid.yml", create_model_yaml())
+    invalid_path = write_metadata_file(
+        PROJECT_DIR, "invalid.yml", create_model_yaml(description=None)
+    )
+
+    def collect(email_domain=EMAIL_DOMAIN, schema_version=SCHEMA_VERSION):
+        VALIDATED_FILES.clear()
+        return collect_table_level_violations(
+            project_dir=str(PROJECT_DIR),
+            email_domain=email_domain,
+            schema_version=schema_version,
+            max_workers=1,
+        )
+
+    report = collect()
+    assert sorted(VALIDATED_FILES) == sorted([valid_path, invalid_path])
+
+    # Unchanged files are read from the cache, along with their violations.
+    assert collect() == report
+    assert VALIDATED_FILES == []
+
+    # Edited files are validated again.
+    write_metadata_file(PROJECT_DIR, "invalid.yml", create_model_yaml())
+    assert collect() == {}
+    assert VALIDATED_FILES == [invalid_path]
+
+    # Changing the validation settings invalidates all verdicts.
+    collect(email_domain="other.com")
+    assert sorted(VALIDATED_FILES) == sorted([valid_path, invalid_path])
+
+    collect(email_domain="other.com", schema_version=3)
+    assert sorted(VALIDATED_FILES) == sorted([valid_path, invalid_path])
+
+
+def test_collect_table_level_violations_unwritable_cache(PROJECT_DIR, monkeypatch):
+    invalid_path = write_metadata_file(
+        PROJECT_DIR, "invalid.yml", create_model_yaml(description=None)
+    )
+
+    def write_validation_cache(cache_path, files):
+        raise PermissionError(f"Permission denied: '{cache_path}'")
+
+    monkeypatch.setattr(
+        validate_tables, "write_validation_cache", write_validation_cache
+    )
+
+    report = collect_table_level_violations(
+        project_dir=str(PROJECT_DIR),
+        email_domain=EMAIL_DOMAIN,
+        schema_version=SCHEMA_VERSION,
+    )
+
+    assert list(report) == [invalid_path]
+    assert not PROJECT_DIR.joinpath("target").exists()
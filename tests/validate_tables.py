@@ -1,322 +1,729 @@
-import logging
-from pathlib import Path
-from typing import List
-import yaml
-import os
-import sys
-
-# solution to import files across the repo until we make this repo a python package
-current_directory = os.path.dirname(__file__)
-parent_directory = os.path.dirname(current_directory)
-nesso_module = os.path.join(parent_directory, "cli", "nesso")
-sys.path.insert(1, nesso_module)
-
-
-from common import find_dbt_project
-
-logger = logging.getLogger(__name__)
-
-PROJECT_DIR = find_dbt_project()
-
-VALID_SCHEMA_VERSION = 2
-
-
-def get_dbt_object_type(data: str) -> str:
-    """
-    Gets dbt object type ("sources", "models", or "seeds") depending on yaml data.
-
-    Args:
-        data (str): The content of a "metadata yaml file" of a dbt source, seed or model.
-
-    Returns:
-        schema_type (str): the schema type of the dbt object. ("sources", "models", or "seeds").
-    """
-    if "sources" in data:
-        schema_type = "sources"
-    elif "models" in data:
-        schema_type = "models"
-    elif "seeds" in data:
-        schema_type = "seeds"
-    return schema_type
-
-
-def get_metadata_information(file_path: str) -> list:
-    """
-    Gets metadata information of a dbt object.
-
-    Args:
-        file_path (str): Path to the metadata file of a dbt object.
-
-    Returns:
-        metadata_information (List[dict]): The metadata information of the dbt object.
-    """
-    with open(file_path) as file:
-        data: dict = yaml.safe_load(file)
-
-    schema_type: str = get_dbt_object_type(data)
-    metadata_information: List[dict] = data[schema_type]
-
-    if schema_type == "sources":
-        metadata_information: List[dict] = metadata_information[0].get("tables")
-
-    return metadata_information
-
-
-def validate_description_in_file(file_path: str) -> bool:
-    """
-    Validates descriptions in a metadata file of a dbt object.
-
-    Args:
-        file_path (str): Path to the metadata file of a dbt object.
-
-    Returns:
-        bool: `True` if all the field is valid, `Exception` otherwise.
-    """
-    information: List[dict] = get_metadata_information(file_path=file_path)
-
-    descriptions = []
-    for table in information:
-        table_description: str = table.get("description")
-        descriptions.append(table_description)
-        columns: List[dict] = table.get("columns")
-        for column in columns:
-            column_description: str = column.get("description")
-            descriptions.append(column_description)
-
-    are_all_descriptions_filled = all(descriptions)
-    if not are_all_descriptions_filled:
-        raise ValueError(f"Please fill all descriptions in {file_path} file.")
-
-    return True
-
-
-def validate_technical_owner_in_file(file_path: str, email_domain: str) -> bool:
-    """
-    Validates technical owner in a metadata file of a dbt object.
-
-    Args:
-        file_path (str): Path to the metadata file of a dbt object.
-
-    Returns:
-        bool: `True` if all the field is valid, `Exception` otherwise.
-    """
-    information: List[dict] = get_metadata_information(file_path=file_path)
-
-    technical_owners = []
-    for table in information:
-        technical_owner: str = table.get("meta").get("technical_owner")
-        technical_owners.append(technical_owner)
-
-    are_all_technical_owners_filled = all(technical_owners)
-    if not are_all_technical_owners_filled:
-        raise ValueError(f"Please fill in the technical owner in the {file_path} file.")
-
-    email_termination = f"@{email_domain}" if email_domain else ""
-
-    technical_owners_validity = []
-    for technical_owner in technical_owners:
-        is_technical_owner_a_valid_email = technical_owner.endswith(email_termination)
-        is_technical_owner_a_valid_group = technical_owner.startswith("@")
-
-        is_technical_owner_valid = bool(
-            is_technical_owner_a_valid_email or is_technical_owner_a_valid_group
-        )
-        technical_owners_validity.append(is_technical_owner_valid)
-
-    are_all_technical_owners_valid = all(technical_owners_validity)
-    if not are_all_technical_owners_valid:
-        raise ValueError(
-            f"Please insert valid technical owner in {file_path} file. technical_owner should be an email {'ending with ' + email_termination if email_termination else ''} or a group starting with '@'."
-        )
-
-    return True
-
-
-def validate_business_owner_in_file(file_path: str, email_domain: str) -> bool:
-    """
-    Validates business owner in a metadata file of a dbt object.
-
-    Args:
-        file_path (str): Path to the metadata file of a dbt object.
-
-    Returns:
-        bool: `True` if all the field is valid, `Exception` otherwise.
-    """
-    information: List[dict] = get_metadata_information(file_path=file_path)
-
-    business_owners = []
-    for table in information:
-        business_owner: str = table.get("meta").get("business_owner")
-        business_owners.append(business_owner)
-
-    are_all_business_owners_filled = all(business_owners)
-    if not are_all_business_owners_filled:
-        raise ValueError(f"Please fill in the business owner in the {file_path} file.")
-
-    email_termination: str = f"@{email_domain}" if email_domain else ""
-
-    business_owners_validity = []
-    for business_owner in business_owners:
-        is_business_owner_a_valid_email = business_owner.endswith(email_termination)
-        is_business_owner_a_valid_group = business_owner.startswith("@")
-
-        business_owner_is_valid = bool(
-            is_business_owner_a_valid_email or is_business_owner_a_valid_group
-        )
-        business_owners_validity.append(business_owner_is_valid)
-
-    are_all_business_owners_valid = all(business_owners_validity)
-    if not are_all_business_owners_valid:
-        raise ValueError(
-            f"Please insert valid business owner in {file_path} file. business_owner should be an email {'ending with ' + email_termination if email_termination else ''} or a group starting with '@'."
-        )
-
-    return True
-
-
-def validate_version_in_file(
-    file_path: str, schema_version: int = VALID_SCHEMA_VERSION
-) -> bool:
-    """
-    Validates schema version in a metadata file of a dbt object.
-
-    Args:
-        file_path (str): Path to the metadata file of a dbt object.
-
-    Returns:
-        bool: `True` if all the field is valid, `Exception` otherwise.
-    """
-    with open(file_path) as file:
-        data: dict = yaml.safe_load(file)
-    version: int = data.get("version")
-    if version != schema_version:
-        raise ValueError(f"Please use version {schema_version} in {file_path} file.")
-    return True
-
-
-def validate_file(
-    file_path: str,
-    email_domain: str,
-    schema_version: str,
-) -> bool:
-    """
-    Checks if the fields retrieved from the metadata files in the dbt project are valid.
-
-    The following fields are verified:
-    1) The `description` field is filled in
-    2) The `technical_owner` field is using the correct email domain or correct group structure
-    3) The `business_owner` field is using the correct email domain or correct group structure
-    4) The `version` field is using the correct version number
-
-    Args:
-        description(str): The `description` field retrieved from a specific table.
-        technical_owner(str): The `technical_owner` field retrieved from a specific table.
-        business_owner(str): The `business_owner` field retrieved from a specific table.
-        version(int): The `version` field retrieved from a specific table.
-        email_domain(str, optional): The `email_domain` field retrieved from a specific table.
-        dir_path(str): The path under which the file being validated exists.
-
-    Returns:
-        bool: `True` if all the fields are valid, `Exception` otherwise.
-
-    """
-
-    # Description validation
-    validate_description_in_file(file_path=file_path)
-
-    # Technical Owner validation
-    validate_technical_owner_in_file(file_path=file_path, email_domain=email_domain)
-
-    # Business Owner validation
-    validate_business_owner_in_file(file_path=file_path, email_domain=email_domain)
-
-    # Version validation
-    validate_version_in_file(file_path=file_path, schema_version=schema_version)
-
-    return True
-
-
-def get_yaml_paths_under_directory(directory_path: str) -> List[str]:
-    """
-    Gets paths of yaml files under 'directory_path' argument, and return path of yamls inside.
-
-    Args:
-        directory_path (str): Path to a directory that contains metadata files.
-
-    Returns:
-        paths_to_metadata_yamls (List[str]): List containing absolute paths to yaml files under dir_list
-    """
-    paths_to_metadata_yamls = []
-    for path in Path(directory_path).rglob("*.yml"):
-        absoute_path = str(path.absolute())
-        paths_to_metadata_yamls.append(absoute_path)
-
-    return paths_to_metadata_yamls
-
-
-def get_models_and_seeds_paths(project_dir: str) -> List[str]:
-    """
-    Gets all models and seeds paths under a dbt project.
-
-    Args:
-        project_dir (str): Path to the main dbt project.
-
-    Returns:
-        models_and_seeds_full_paths: The full path of every.
-    """
-    project_yml_path = f"{project_dir}/dbt_project.yml"
-
-    with open(project_yml_path) as file:
-        data: dict = yaml.safe_load(file)
-        models_paths: list = data["model-paths"]
-        seeds_paths: list = data["seed-paths"]
-
-    models_and_seeds_paths: list = models_paths + seeds_paths
-
-    models_and_seeds_full_paths = [
-        os.path.join(project_dir, model_or_seed_path)
-        for model_or_seed_path in models_and_seeds_paths
-    ]
-
-    return models_and_seeds_full_paths
-
-
-def run_table_level_validation(
-    project_dir: str, email_domain: str, schema_version: int
-) -> bool:
-    """
-    Runs the validation of all tables inside a dbt project
-
-    Args:
-        project_dir (str): Path to the main dbt project.
-        email_domain (str): valid email domain for your organization.
-        schema_version (int): valid schema version for your organization.
-
-    Returns:
-        bool: `True` if all the fields are valid, `Exception` otherwise.
-    """
-
-    models_and_seeds_paths: list = get_models_and_seeds_paths(project_dir)
-
-    paths_of_files_to_validate = []
-    # Get path of yamls under models and seeds dirs
-    for directory_path in models_and_seeds_paths:
-        yamls_paths: list = get_yaml_paths_under_directory(directory_path)
-
-        # using .extend() because get_yaml_paths_under_directory returns a list
-        paths_of_files_to_validate.extend(yamls_paths)
-
-    for path in paths_of_files_to_validate:
-        validate_file(
-            file_path=path, email_domain=email_domain, schema_version=schema_version
-        )
-
-    return True
-
-
-if __name__ == "__main__":
-    run_table_level_validation(
-        project_dir=PROJECT_DIR,
-        email_domain="",
-        schema_version=VALID_SCHEMA_VERSION,
-    )
+import hashlib
+import json
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import Dict, List, Optional
+import yaml
+import os
+import sys
+
+# Use the libyaml-backed loader when PyYAML was built with it; it's several times
+# faster than the pure-Python one.
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
+# solution to import files across the repo until we make this repo a python package
+current_directory = os.path.dirname(__file__)
+parent_directory = os.path.dirname(current_directory)
+nesso_module = os.path.join(parent_directory, "cli", "nesso")
+sys.path.insert(1, nesso_module)
+
+logger = logging.getLogger(__name__)
+
+VALID_SCHEMA_VERSION = 2
+
+# Below this number of files, spinning up worker processes costs more than it saves.
+MIN_FILES_FOR_PARALLEL_VALIDATION = 32
+
+# Bump whenever the validation rules change, so that cached verdicts are discarded.
+VALIDATION_CACHE_VERSION = 1
+VALIDATION_CACHE_FILE_NAME = "metadata_validation_cache.json"
+
+
+def get_project_dir() -> str:
+    """
+    Gets the path to the main dbt project.
+
+    Setting `DBT_PROJECT_DIR` skips the directory walk, eg. in containers.
+
+    Returns:
+        project_dir (str): Path to the main dbt project.
+    """
+    project_dir = os.environ.get("DBT_PROJECT_DIR")
+    if project_dir:
+        return project_dir
+
+    # Imported lazily, so that importing this module (including in every worker
+    # process) doesn't pull in the nesso CLI and its dependencies.
+    from common import find_dbt_project
+
+    return find_dbt_project()
+
+
+def load_metadata_file(file_path: str) -> dict:
+    """
+    Parses a metadata file of a dbt object.
+
+    Args:
+        file_path (str): Path to the metadata file of a dbt object.
+
+    Returns:
+        data (dict): The parsed content of the file.
+    """
+    with open(file_path) as file:
+        data: dict = yaml.load(file, Loader=SafeLoader)
+    return data
+
+
+def get_dbt_object_type(data: str) -> str:
+    """
+    Gets dbt object type ("sources", "models", or "seeds") depending on yaml data.
+
+    Args:
+        data (str): The content of a "metadata yaml file" of a dbt source, seed or model.
+
+    Returns:
+        schema_type (str): the schema type of the dbt object. ("sources", "models", or "seeds").
+    """
+    if "sources" in data:
+        schema_type = "sources"
+    elif "models" in data:
+        schema_type = "models"
+    elif "seeds" in data:
+        schema_type = "seeds"
+    return schema_type
+
+
+def extract_metadata_information(data: dict) -> List[dict]:
+    """
+    Extracts metadata information of a dbt object from the parsed metadata file.
+
+    Args:
+        data (dict): The parsed content of a metadata file of a dbt object.
+
+    Returns:
+        metadata_information (List[dict]): The metadata information of the dbt object.
+    """
+    schema_type: str = get_dbt_object_type(data)
+    metadata_information: List[dict] = data[schema_type] or []
+
+    if schema_type == "sources":
+        sources: List[dict] = metadata_information or [{}]
+        metadata_information: List[dict] = sources[0].get("tables") or []
+
+    return metadata_information
+
+
+def get_metadata_information(file_path: str) -> list:
+    """
+    Gets metadata information of a dbt object.
+
+    Args:
+        file_path (str): Path to the metadata file of a dbt object.
+
+    Returns:
+        metadata_information (List[dict]): The metadata information of the dbt object.
+    """
+    data: dict = load_metadata_file(file_path)
+    return extract_metadata_information(data)
+
+
+def check_descriptions(information: List[dict], file_path: str) -> List[str]:
+    """
+    Checks that all table and column descriptions are filled in.
+
+    Args:
+        information (List[dict]): The metadata information of a dbt object.
+        file_path (str): Path to the metadata file, used in violation messages.
+
+    Returns:
+        violations (List[str]): Violation messages; empty if the field is valid.
+    """
+    descriptions = []
+    for table in information:
+        table_description: str = table.get("description")
+        descriptions.append(table_description)
+        columns: List[dict] = table.get("columns") or []
+        for column in columns:
+            column_description: str = column.get("description")
+            descriptions.append(column_description)
+
+    are_all_descriptions_filled = all(descriptions)
+    if not are_all_descriptions_filled:
+        return [f"Please fill all descriptions in {file_path} file."]
+
+    return []
+
+
+def check_owners(
+    information: List[dict], file_path: str, owner_field: str, email_domain: str
+) -> List[str]:
+    """
+    Checks that an owner field is filled in and is either a valid email or a group.
+
+    Args:
+        information (List[dict]): The metadata information of a dbt object.
+        file_path (str): Path to the metadata file, used in violation messages.
+        owner_field (str): The owner field to check, eg. `technical_owner`.
+        email_domain (str): Valid email domain for your organization.
+
+    Returns:
+        violations (List[str]): Violation messages; empty if the field is valid.
+    """
+    owner_name = owner_field.replace("_", " ")
+
+    owners = []
+    for table in information:
+        owner: str = (table.get("meta") or {}).get(owner_field)
+        owners.append(owner)
+
+    are_all_owners_filled = all(owners)
+    if not are_all_owners_filled:
+        return [f"Please fill in the {owner_name} in the {file_path} file."]
+
+    email_termination: str = f"@{email_domain}" if email_domain else ""
+
+    owners_validity = []
+    for owner in owners:
+        if not isinstance(owner, str):
+            owners_validity.append(False)
+            continue
+
+        is_owner_a_valid_email = owner.endswith(email_termination)
+        is_owner_a_valid_group = owner.startswith("@")
+
+        is_owner_valid = bool(is_owner_a_valid_email or is_owner_a_valid_group)
+        owners_validity.append(is_owner_valid)
+
+    are_all_owners_valid = all(owners_validity)
+    if not are_all_owners_valid:
+        return [
+            f"Please insert valid {owner_name} in {file_path} file. {owner_field} should be an email {'ending with ' + email_termination if email_termination else ''} or a group starting with '@'."
+        ]
+
+    return []
+
+
+def check_version(data: dict, file_path: str, schema_version: int) -> List[str]:
+    """
+    Checks the schema version of a parsed metadata file.
+
+    Args:
+        data (dict): The parsed content of a metadata file of a dbt object.
+        file_path (str): Path to the metadata file, used in violation messages.
+        schema_version (int): Valid schema version for your organization.
+
+    Returns:
+        violations (List[str]): Violation messages; empty if the field is valid.
+    """
+    version: int = data.get("version")
+    if version != schema_version:
+        return [f"Please use version {schema_version} in {file_path} file."]
+    return []
+
+
+def _raise_on_violations(violations: List[str]) -> bool:
+    if violations:
+        raise ValueError("\n".join(violations))
+    return True
+
+
+def validate_description_in_file(file_path: str) -> bool:
+    """
+    Validates descriptions in a metadata file of a dbt object.
+
+    Args:
+        file_path (str): Path to the metadata file of a dbt object.
+
+    Returns:
+        bool: `True` if all the field is valid, `Exception` otherwise.
+    """
+    information: List[dict] = get_metadata_information(file_path=file_path)
+    return _raise_on_violations(check_descriptions(information, file_path))
+
+
+def validate_technical_owner_in_file(file_path: str, email_domain: str) -> bool:
+    """
+    Validates technical owner in a metadata file of a dbt object.
+
+    Args:
+        file_path (str): Path to the metadata file of a dbt object.
+
+    Returns:
+        bool: `True` if all the field is valid, `Exception` otherwise.
+    """
+    information: List[dict] = get_metadata_information(file_path=file_path)
+    violations = check_owners(
+        information, file_path, owner_field="technical_owner", email_domain=email_domain
+    )
+    return _raise_on_violations(violations)
+
+
+def validate_business_owner_in_file(file_path: str, email_domain: str) -> bool:
+    """
+    Validates business owner in a metadata file of a dbt object.
+
+    Args:
+        file_path (str): Path to the metadata file of a dbt object.
+
+    Returns:
+        bool: `True` if all the field is valid, `Exception` otherwise.
+    """
+    information: List[dict] = get_metadata_information(file_path=file_path)
+    violations = check_owners(
+        information, file_path, owner_field="business_owner", email_domain=email_domain
+    )
+    return _raise_on_violations(violations)
+
+
+def validate_version_in_file(
+    file_path: str, schema_version: int = VALID_SCHEMA_VERSION
+) -> bool:
+    """
+    Validates schema version in a metadata file of a dbt object.
+
+    Args:
+        file_path (str): Path to the metadata file of a dbt object.
+
+    Returns:
+        bool: `True` if all the field is valid, `Exception` otherwise.
+    """
+    data: dict = load_metadata_file(file_path)
+    return _raise_on_violations(check_version(data, file_path, schema_version))
+
+
+def is_table_well_formed(table: dict) -> bool:
+    """
+    Checks that a table has the structure expected by the validation rules.
+
+    Args:
+        table (dict): The metadata information of a single table.
+
+    Returns:
+        bool: Whether the table and its `meta` are mappings and its `columns` a list
+            of mappings.
+    """
+    if not isinstance(table, dict):
+        return False
+
+    meta = table.get("meta")
+    if meta is not None and not isinstance(meta, dict):
+        return False
+
+    columns = table.get("columns")
+    if columns is None:
+        return True
+    return isinstance(columns, list) and all(
+        isinstance(column, dict) for column in columns
+    )
+
+
+def get_file_violations(
+    file_path: str,
+    email_domain: str,
+    schema_version: int,
+) -> List[str]:
+    """
+    Parses a metadata file once and runs all the validation rules over it.
+
+    Args:
+        file_path (str): Path to the metadata file of a dbt object.
+        email_domain (str): Valid email domain for your organization.
+        schema_version (int): Valid schema version for your organization.
+
+    Returns:
+        violations (List[str]): All violation messages found in the file.
+    """
+    try:
+        data: dict = load_metadata_file(file_path)
+    except (OSError, UnicodeDecodeError) as e:
+        return [f"Could not read {file_path} file: {e}"]
+    except yaml.YAMLError as e:
+        return [f"Could not parse {file_path} file: {e}"]
+
+    if not isinstance(data, dict) or not any(
+        key in data for key in ("sources", "models", "seeds")
+    ):
+        return [f"Could not find sources, models or seeds in {file_path} file."]
+
+    try:
+        information: List[dict] = extract_metadata_information(data)
+    except (AttributeError, KeyError, TypeError):
+        return [f"Could not parse the sources in {file_path} file."]
+
+    if not information:
+        return [f"Could not find any tables in {file_path} file."]
+
+    if not isinstance(information, list) or not all(
+        is_table_well_formed(table) for table in information
+    ):
+        return [f"Could not parse the tables in {file_path} file."]
+
+    violations = []
+    violations.extend(check_descriptions(information, file_path))
+    violations.extend(
+        check_owners(
+            information,
+            file_path,
+            owner_field="technical_owner",
+            email_domain=email_domain,
+        )
+    )
+    violations.extend(
+        check_owners(
+            information,
+            file_path,
+            owner_field="business_owner",
+            email_domain=email_domain,
+        )
+    )
+    violations.extend(check_version(data, file_path, schema_version))
+
+    return violations
+
+
+def validate_file(
+    file_path: str,
+    email_domain: str,
+    schema_version: str,
+) -> bool:
+    """
+    Checks if the fields retrieved from the metadata files in the dbt project are valid.
+
+    The following fields are verified:
+    1) The `description` field is filled in
+    2) The `technical_owner` field is using the correct email domain or correct group structure
+    3) The `business_owner` field is using the correct email domain or correct group structure
+    4) The `version` field is using the correct version number
+
+    Args:
+        file_path (str): Path to the metadata file of a dbt object.
+        email_domain (str): Valid email domain for your organization.
+        schema_version (int): Valid schema version for your organization.
+
+    Returns:
+        bool: `True` if all the fields are valid, `Exception` listing all the
+            violations in the file otherwise.
+
+    """
+    violations = get_file_violations(
+        file_path=file_path, email_domain=email_domain, schema_version=schema_version
+    )
+    return _raise_on_violations(violations)
+
+
+def get_yaml_paths_under_directory(directory_path: str) -> List[str]:
+    """
+    Gets paths of yaml files under 'directory_path' argument, and return path of yamls inside.
+
+    Args:
+        directory_path (str): Path to a directory that contains metadata files.
+
+    Returns:
+        paths_to_metadata_yamls (List[str]): List containing absolute paths to yaml files under dir_list
+    """
+    paths_to_metadata_yamls = []
+    for path in Path(directory_path).rglob("*.yml"):
+        absoute_path = str(path.absolute())
+        paths_to_metadata_yamls.append(absoute_path)
+
+    return paths_to_metadata_yamls
+
+
+def read_dbt_project_config(project_dir: str) -> dict:
+    """
+    Reads the `dbt_project.yml` file of a dbt project.
+
+    Args:
+        project_dir (str): Path to the main dbt project.
+
+    Returns:
+        config (dict): The content of the `dbt_project.yml` file.
+    """
+    return load_metadata_file(f"{project_dir}/dbt_project.yml")
+
+
+def get_models_and_seeds_paths(
+    project_dir: str, dbt_project_config: Optional[dict] = None
+) -> List[str]:
+    """
+    Gets all models and seeds paths under a dbt project.
+
+    Args:
+        project_dir (str): Path to the main dbt project.
+        dbt_project_config (dict, optional): The content of the project's
+            `dbt_project.yml` file. Read from `project_dir` if not provided.
+
+    Returns:
+        models_and_seeds_full_paths: The full path of every.
+    """
+    data: dict = dbt_project_config or read_dbt_project_config(project_dir)
+    models_paths: list = data["model-paths"]
+    seeds_paths: list = data["seed-paths"]
+
+    models_and_seeds_paths: list = models_paths + seeds_paths
+
+    models_and_seeds_full_paths = [
+        os.path.join(project_dir, model_or_seed_path)
+        for model_or_seed_path in models_and_seeds_paths
+    ]
+
+    return models_and_seeds_full_paths
+
+
+def get_validation_cache_path(
+    project_dir: str, dbt_project_config: Optional[dict] = None
+) -> str:
+    """
+    Gets the path of the validation cache, stored in the dbt project's target directory.
+
+    Args:
+        project_dir (str): Path to the main dbt project.
+        dbt_project_config (dict, optional): The content of the project's
+            `dbt_project.yml` file. Read from `project_dir` if not provided.
+
+    Returns:
+        validation_cache_path (str): Path to the validation cache file.
+    """
+    data: dict = dbt_project_config or read_dbt_project_config(project_dir)
+    target_path: str = data.get("target-path", "target")
+
+    return os.path.join(project_dir, target_path, VALIDATION_CACHE_FILE_NAME)
+
+
+def get_validation_cache_key(
+    file_path: str, email_domain: str, schema_version: int
+) -> str:
+    """
+    Computes the key under which the verdict for a metadata file is cached.
+
+    The key changes whenever the file's content, the validation settings, or the
+    validation rules change.
+
+    Args:
+        file_path (str): Path to the metadata file of a dbt object.
+        email_domain (str): Valid email domain for your organization.
+        schema_version (int): Valid schema version for your organization.
+
+    Returns:
+        key (str): The cache key.
+    """
+    key = hashlib.sha256()
+    key.update(f"{VALIDATION_CACHE_VERSION}:{email_domain}:{schema_version}:".encode())
+    with open(file_path, "rb") as file:
+        key.update(file.read())
+    return key.hexdigest()
+
+
+def read_validation_cache(cache_path: str) -> Dict[str, dict]:
+    """
+    Reads the validation cache. A missing or unreadable cache is treated as empty.
+
+    Args:
+        cache_path (str): Path to the validation cache file.
+
+    Returns:
+        cache (Dict[str, dict]): Cached verdicts (`key` and `violations`) by file path.
+    """
+    try:
+        with open(cache_path) as file:
+            cache: dict = json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+    if cache.get("version") != VALIDATION_CACHE_VERSION:
+        return {}
+
+    return cache.get("files", {})
+
+
+def write_validation_cache(cache_path: str, files: Dict[str, dict]) -> None:
+    """
+    Atomically writes the validation cache.
+
+    Args:
+        cache_path (str): Path to the validation cache file.
+        files (Dict[str, dict]): Verdicts (`key` and `violations`) by file path.
+    """
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    temporary_cache_path = f"{cache_path}.{os.getpid()}.tmp"
+    with open(temporary_cache_path, "w") as file:
+        json.dump({"version": VALIDATION_CACHE_VERSION, "files": files}, file)
+    os.replace(temporary_cache_path, cache_path)
+
+
+def get_paths_of_files_to_validate(
+    project_dir: str, dbt_project_config: Optional[dict] = None
+) -> List[str]:
+    """
+    Gets paths of all the metadata files under the models and seeds paths of a dbt project.
+
+    Args:
+        project_dir (str): Path to the main dbt project.
+        dbt_project_config (dict, optional): The content of the project's
+            `dbt_project.yml` file. Read from `project_dir` if not provided.
+
+    Returns:
+        paths_of_files_to_validate (List[str]): Absolute paths to the metadata files.
+    """
+    models_and_seeds_paths: list = get_models_and_seeds_paths(
+        project_dir, dbt_project_config
+    )
+
+    paths_of_files_to_validate = []
+    # Get path of yamls under models and seeds dirs
+    for directory_path in models_and_seeds_paths:
+        yamls_paths: list = get_yaml_paths_under_directory(directory_path)
+
+        # using .extend() because get_yaml_paths_under_directory returns a list
+        paths_of_files_to_validate.extend(yamls_paths)
+
+    return paths_of_files_to_validate
+
+
+def collect_table_level_violations(
+    project_dir: str,
+    email_domain: str,
+    schema_version: int,
+    max_workers: Optional[int] = None,
+    use_cache: bool = True,
+) -> Dict[str, List[str]]:
+    """
+    Validates all metadata files inside a dbt project and collects every violation.
+
+    Each file is parsed only once. If there are enough files, they are validated
+    in parallel in a process pool. Verdicts are cached in the project's target
+    directory, so files which haven't changed since the last run aren't validated
+    again.
+
+    Args:
+        project_dir (str): Path to the main dbt project.
+        email_domain (str): valid email domain for your organization.
+        schema_version (int): valid schema version for your organization.
+        max_workers (int, optional): The maximum number of worker processes.
+            Set to 1 to validate sequentially. Defaults to the number of CPUs.
+        use_cache (bool, optional): Whether to reuse and update the validation
+            cache. Defaults to True.
+
+    Returns:
+        report (Dict[str, List[str]]): Violation messages by file path. Only files
+            with at least one violation are included.
+    """
+    dbt_project_config = read_dbt_project_config(project_dir)
+    paths_of_files_to_validate = get_paths_of_files_to_validate(
+        project_dir, dbt_project_config
+    )
+
+    if use_cache:
+        cache_path = get_validation_cache_path(project_dir, dbt_project_config)
+        cache = read_validation_cache(cache_path)
+    else:
+        cache = {}
+
+    keys = {}
+    report = {}
+    paths_to_validate = []
+    for path in paths_of_files_to_validate:
+        if use_cache:
+            try:
+                keys[path] = get_validation_cache_key(
+                    path, email_domain, schema_version
+                )
+            except OSError:
+                # Unreadable files are never cached; validation reports the error.
+                paths_to_validate.append(path)
+                continue
+            cached_verdict = cache.get(path, {})
+            if cached_verdict.get("key") == keys[path]:
+                report[path] = cached_verdict["violations"]
+                continue
+        paths_to_validate.append(path)
+
+    validate = partial(
+        get_file_violations, email_domain=email_domain, schema_version=schema_version
+    )
+
+    if max_workers == 1 or len(paths_to_validate) < MIN_FILES_FOR_PARALLEL_VALIDATION:
+        violations_per_file = map(validate, paths_to_validate)
+        report.update(zip(paths_to_validate, violations_per_file))
+    else:
+        workers = max_workers or os.cpu_count() or 1
+        chunksize = max(1, len(paths_to_validate) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            violations_per_file = executor.map(
+                validate, paths_to_validate, chunksize=chunksize
+            )
+            report.update(zip(paths_to_validate, violations_per_file))
+
+    if use_cache:
+        files_count = len(paths_of_files_to_validate)
+        hits_count = files_count - len(paths_to_validate)
+        hit_ratio = hits_count / files_count if files_count else 0
+        logger.info(
+            f"Validation cache: reused {hits_count} of {files_count} verdicts ({hit_ratio:.1%} hit ratio)."
+        )
+        # The verdicts are already computed, so failing to store them (eg. in a
+        # read-only target directory) shouldn't fail the validation.
+        try:
+            write_validation_cache(
+                cache_path,
+                {
+                    path: {"key": keys[path], "violations": report[path]}
+                    for path in paths_of_files_to_validate
+                    if path in keys
+                },
+            )
+        except OSError as e:
+            logger.warning(f"Could not write the validation cache to {cache_path}: {e}")
+
+    return {path: report[path] for path in paths_of_files_to_validate if report[path]}
+
+
+def run_table_level_validation(
+    project_dir: str,
+    email_domain: str,
+    schema_version: int,
+    max_workers: Optional[int] = None,
+    use_cache: bool = True,
+) -> bool:
+    """
+    Runs the validation of all tables inside a dbt project
+
+    Args:
+        project_dir (str): Path to the main dbt project.
+        email_domain (str): valid email domain for your organization.
+        schema_version (int): valid schema version for your organization.
+        max_workers (int, optional): The maximum number of worker processes.
+            Set to 1 to validate sequentially. Defaults to the number of CPUs.
+        use_cache (bool, optional): Whether to reuse and update the validation
+            cache. Defaults to True.
+
+    Returns:
+        bool: `True` if all the fields are valid, `Exception` listing all the
+            violations in the project otherwise.
+    """
+    report = collect_table_level_violations(
+        project_dir=project_dir,
+        email_domain=email_domain,
+        schema_version=schema_version,
+        max_workers=max_workers,
+        use_cache=use_cache,
+    )
+
+    if report:
+        violations = [
+            violation
+            for file_violations in report.values()
+            for violation in file_violations
+        ]
+        for violation in violations:
+            logger.error(violation)
+        raise ValueError(
+            f"Found {len(violations)} violation(s) in {len(report)} file(s):\n"
+            + "\n".join(violations)
+        )
+
+    return True
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+    run_table_level_validation(
+        project_dir=get_project_dir(),
+        email_domain="",
+        schema_version=VALID_SCHEMA_VERSION,
+    )